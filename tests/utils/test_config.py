@@ -1,8 +1,11 @@
 # Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import json
 import os
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
 from trae_agent.utils.anthropic_client import AnthropicClient
@@ -193,5 +196,53 @@ class TestConfigBaseURL(unittest.TestCase):
         self.assertEqual(client.base_url, "https://custom-anthropic.example.com")
 
 
+class TestConfigFileLoading(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / "trae_config.json"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, provider_count: int) -> None:
+        self.config_file.write_text(
+            json.dumps(
+                {
+                    "default_provider": "provider_0",
+                    "max_steps": 7,
+                    "model_providers": {
+                        f"provider_{i}": {"model": "gpt-4o", "api_key": "k" * 100}
+                        for i in range(provider_count)
+                    },
+                }
+            )
+        )
+
+    def test_load_small_config_file(self):
+        self.write_config(provider_count=1)
+
+        config = Config(str(self.config_file))
+
+        self.assertEqual(config.max_steps, 7)
+        self.assertEqual(config.model_providers["provider_0"].model, "gpt-4o")
+
+    def test_load_large_config_file(self):
+        # Large enough to take the memory-mapped path when orjson is installed
+        self.write_config(provider_count=200)
+        self.assertGreater(self.config_file.stat().st_size, 16 * 1024)
+
+        config = Config(str(self.config_file))
+
+        self.assertEqual(len(config.model_providers), 200)
+
+    @patch("trae_agent.utils.config.orjson", None)
+    def test_load_config_file_without_orjson(self):
+        self.write_config(provider_count=200)
+
+        config = Config(str(self.config_file))
+
+        self.assertEqual(len(config.model_providers), 200)
+
+
 if __name__ == "__main__":
     unittest.main()
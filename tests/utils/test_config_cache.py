@@ -0,0 +1,302 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Tests for ConfigurationCache."""
+
+import json
+import mmap
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from trae_agent.utils.config import Config
+from trae_agent.utils.config_cache import (
+    _MMAP_HASH_THRESHOLD,
+    PERSISTENT_CACHE_ENV_VAR,
+    ConfigLoadTimer,
+    ConfigurationCache,
+    _global_config_cache,
+    _new_file_hasher,
+)
+
+
+class TestConfigurationCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / "trae_config.json"
+        self.write_config(max_steps=20)
+        self.cache = ConfigurationCache()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, max_steps: int) -> None:
+        self.config_file.write_text(
+            json.dumps(
+                {
+                    "default_provider": "openai",
+                    "max_steps": max_steps,
+                    "model_providers": {"openai": {"model": "gpt-4o", "api_key": "test-key"}},
+                    "lakeview_config": {"model_provider": "openai", "model_name": "gpt-4o"},
+                }
+            )
+        )
+
+    def cache_current_config(self) -> None:
+        self.cache.cache_config(str(self.config_file), Config(str(self.config_file)))
+
+    def test_miss_when_not_cached(self):
+        self.assertIsNone(self.cache.get_config(str(self.config_file)))
+        self.assertEqual(self.cache.get_cache_stats()["total_misses"], 1)
+
+    def test_hit_skips_hashing_when_file_unchanged(self):
+        self.cache_current_config()
+
+        with patch.object(self.cache, "_compute_file_hash") as compute_hash:
+            config = self.cache.get_config(str(self.config_file))
+
+        compute_hash.assert_not_called()
+        self.assertIsNotNone(config)
+        self.assertEqual(config.max_steps, 20)
+        self.assertEqual(self.cache.get_cache_stats()["total_hits"], 1)
+
+    def test_hit_is_isolated_from_caller_overrides(self):
+        self.cache_current_config()
+
+        config = self.cache.get_config(str(self.config_file))
+        config.max_steps = 5
+
+        self.assertEqual(self.cache.get_config(str(self.config_file)).max_steps, 20)
+
+    def test_hit_is_isolated_from_nested_caller_overrides(self):
+        self.cache_current_config()
+
+        config = self.cache.get_config(str(self.config_file))
+        config.model_providers["openai"].api_key = "override-key"
+        config.model_providers["openai"].model = "override-model"
+
+        model_parameters = self.cache.get_config(str(self.config_file)).model_providers["openai"]
+        self.assertEqual(model_parameters.api_key, "test-key")
+        self.assertEqual(model_parameters.model, "gpt-4o")
+
+    def test_cached_config_is_isolated_from_the_original(self):
+        config = Config(str(self.config_file))
+        self.cache.cache_config(str(self.config_file), config)
+
+        config.max_steps = 99
+        config.model_providers["openai"].api_key = "override-key"
+
+        cached = self.cache.get_config(str(self.config_file))
+        self.assertEqual(cached.max_steps, 20)
+        self.assertEqual(cached.model_providers["openai"].api_key, "test-key")
+
+    def test_strict_hash_check_hashes_on_every_hit(self):
+        self.cache = ConfigurationCache(strict_hash_check=True)
+        self.cache_current_config()
+
+        with patch.object(
+            self.cache, "_compute_file_hash", wraps=self.cache._compute_file_hash
+        ) as compute_hash:
+            config = self.cache.get_config(str(self.config_file))
+
+        compute_hash.assert_called_once()
+        self.assertIsNotNone(config)
+
+    def test_touched_file_with_same_content_is_still_a_hit(self):
+        self.cache_current_config()
+        st = os.stat(self.config_file)
+        os.utime(self.config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        config = self.cache.get_config(str(self.config_file))
+
+        self.assertIsNotNone(config)
+        self.assertEqual(self.cache.get_cache_stats()["invalidations"], 0)
+
+    def test_modified_file_invalidates_entry(self):
+        self.cache_current_config()
+        self.write_config(max_steps=100)
+
+        self.assertIsNone(self.cache.get_config(str(self.config_file)))
+        self.assertEqual(self.cache.get_cache_stats()["invalidations"], 1)
+        self.assertEqual(self.cache.get_cache_stats()["cache_size"], 0)
+
+    def test_deleted_file_invalidates_entry(self):
+        self.cache_current_config()
+        self.config_file.unlink()
+
+        self.assertIsNone(self.cache.get_config(str(self.config_file)))
+        self.assertEqual(self.cache.get_cache_stats()["invalidations"], 1)
+
+    def test_path_below_a_file_is_treated_as_missing(self):
+        config_path = str(self.config_file / "trae_config.json")
+
+        self.cache.cache_config(config_path, Config({}))
+
+        self.assertIsNone(self.cache.get_config(config_path))
+        self.assertEqual(self.cache.get_cache_stats()["invalidations"], 1)
+
+    def test_evicts_least_recently_used_entry(self):
+        self.cache = ConfigurationCache(max_cache_size=2)
+        self.cache_current_config()
+        self.cache.cache_config("second.json", Config({}))
+
+        # A hit on the config file makes "second.json" the least recently used entry
+        self.assertIsNotNone(self.cache.get_config(str(self.config_file)))
+        self.cache.cache_config("third.json", Config({}))
+
+        cached_files = [entry["file"] for entry in self.cache.get_cache_stats()["cache_entries"]]
+        self.assertEqual(
+            cached_files,
+            [str(self.config_file.absolute()), str(Path("third.json").absolute())],
+        )
+        self.assertEqual(self.cache.get_cache_stats()["evictions"], 1)
+
+
+class TestConfigFileHash(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file = Path(self.temp_dir.name) / "trae_config.json"
+        self.cache = ConfigurationCache()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def streamed_digest(self, data: bytes) -> str:
+        return _new_file_hasher(data).hexdigest()
+
+    def test_large_file_is_hashed_through_mmap(self):
+        data = os.urandom(_MMAP_HASH_THRESHOLD + 1)
+        self.file.write_bytes(data)
+
+        with patch("trae_agent.utils.config_cache.mmap.mmap", wraps=mmap.mmap) as mock_mmap:
+            digest = self.cache._compute_file_hash(self.file)
+
+        mock_mmap.assert_called_once()
+        self.assertEqual(digest, self.streamed_digest(data))
+
+    def test_small_file_matches_streamed_digest(self):
+        data = b'{"max_steps": 20}'
+        self.file.write_bytes(data)
+
+        self.assertEqual(self.cache._compute_file_hash(self.file), self.streamed_digest(data))
+
+    def test_empty_file_is_hashed_without_mmap(self):
+        self.file.write_bytes(b"")
+
+        with patch("trae_agent.utils.config_cache.mmap.mmap") as mock_mmap:
+            digest = self.cache._compute_file_hash(self.file)
+
+        mock_mmap.assert_not_called()
+        self.assertEqual(digest, self.streamed_digest(b""))
+
+    def test_unreadable_file_has_no_hash(self):
+        self.file.write_bytes(os.urandom(_MMAP_HASH_THRESHOLD))
+
+        with patch("trae_agent.utils.config_cache.mmap.mmap", side_effect=OSError("mmap failed")):
+            self.assertEqual(self.cache._compute_file_hash(self.file), "")
+        self.assertEqual(self.cache._compute_file_hash(Path(self.temp_dir.name) / "missing"), "")
+
+
+class TestPersistentConfigurationCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / "trae_config.json"
+        self.config_file.write_text(json.dumps({"max_steps": 42}))
+        self.cache_file = Path(self.temp_dir.name) / "cache" / "config.pkl"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def new_cache(self) -> ConfigurationCache:
+        return ConfigurationCache(persistent_cache_file=self.cache_file)
+
+    def test_entries_survive_a_new_cache_instance(self):
+        self.new_cache().cache_config(str(self.config_file), Config(str(self.config_file)))
+
+        config = self.new_cache().get_config(str(self.config_file))
+
+        self.assertIsNotNone(config)
+        self.assertEqual(config.max_steps, 42)
+
+    def test_caller_overrides_are_not_persisted(self):
+        config = Config(str(self.config_file))
+        config.model_providers["anthropic"].api_key = "override-key"
+        self.new_cache().cache_config(str(self.config_file), config)
+
+        self.assertNotIn(b"override-key", self.cache_file.read_bytes())
+        restored = self.new_cache().get_config(str(self.config_file))
+        self.assertEqual(restored.model_providers["anthropic"].api_key, "")
+
+    def test_cache_file_is_private(self):
+        self.new_cache().cache_config(str(self.config_file), Config(str(self.config_file)))
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_file).st_mode), 0o600)
+
+    def test_changed_file_is_not_loaded_from_disk(self):
+        self.new_cache().cache_config(str(self.config_file), Config(str(self.config_file)))
+        self.config_file.write_text(json.dumps({"max_steps": 100}))
+
+        self.assertEqual(self.new_cache().get_cache_stats()["cache_size"], 0)
+
+    def test_recaching_an_unchanged_file_does_not_rewrite_cache_file(self):
+        cache = self.new_cache()
+        cache.cache_config(str(self.config_file), Config(str(self.config_file)))
+
+        with patch.object(ConfigurationCache, "_save_persistent_cache") as mock_save:
+            cache.cache_config(str(self.config_file), Config(str(self.config_file)))
+            self.new_cache().cache_config(str(self.config_file), Config(str(self.config_file)))
+            mock_save.assert_not_called()
+
+            self.config_file.write_text(json.dumps({"max_steps": 100}))
+            cache.cache_config(str(self.config_file), Config(str(self.config_file)))
+            mock_save.assert_called_once()
+
+    def test_corrupt_cache_file_is_ignored(self):
+        self.cache_file.parent.mkdir(parents=True)
+        self.cache_file.write_bytes(b"not a pickle")
+
+        self.assertEqual(self.new_cache().get_cache_stats()["cache_size"], 0)
+
+    def test_clear_cache_removes_cache_file(self):
+        cache = self.new_cache()
+        cache.cache_config(str(self.config_file), Config(str(self.config_file)))
+        self.assertTrue(self.cache_file.exists())
+
+        cache.clear_cache()
+
+        self.assertFalse(self.cache_file.exists())
+
+
+class TestGlobalConfigCache(unittest.TestCase):
+    def setUp(self):
+        _global_config_cache.cache_clear()
+
+    def tearDown(self):
+        _global_config_cache.cache_clear()
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_persistence_is_off_by_default(self):
+        self.assertIsNone(_global_config_cache().persistent_cache_file)
+
+    def test_persistence_is_enabled_by_env_var(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "config.pkl"
+            with patch.dict(os.environ, {PERSISTENT_CACHE_ENV_VAR: str(cache_file)}):
+                self.assertEqual(_global_config_cache().persistent_cache_file, cache_file)
+
+
+class TestConfigLoadTimer(unittest.TestCase):
+    @patch("trae_agent.utils.config_cache.time.perf_counter_ns", side_effect=[1_000_000, 3_500_000])
+    def test_duration_ms(self, mock_perf_counter_ns):
+        with ConfigLoadTimer("Config load") as timer:
+            pass
+
+        self.assertEqual(timer.duration_ms, 2.5)
+        self.assertEqual(str(timer), "Config load: 2.50ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
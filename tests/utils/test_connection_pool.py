@@ -0,0 +1,188 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Tests for the HTTP connection pool."""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from trae_agent.utils.connection_pool import (
+    ConnectionPoolManager,
+    ConnectionPoolMetrics,
+    PooledOpenAIClient,
+)
+
+
+class TestConnectionPoolManager(unittest.TestCase):
+    def setUp(self):
+        self.async_client_patcher = patch(
+            "trae_agent.utils.connection_pool.httpx.AsyncClient",
+            side_effect=lambda **kwargs: AsyncMock(kwargs=kwargs),
+        )
+        self.mock_async_client = self.async_client_patcher.start()
+
+    def tearDown(self):
+        self.async_client_patcher.stop()
+        ConnectionPoolManager._clients.clear()
+
+    def test_get_client_reuses_pooled_client(self):
+        async def get_twice():
+            first = await ConnectionPoolManager.get_client("openai", base_url="https://a.test")
+            second = await ConnectionPoolManager.get_client("openai", base_url="https://a.test")
+            return first, second
+
+        first, second = asyncio.run(get_twice())
+
+        self.assertIs(first, second)
+        self.mock_async_client.assert_called_once()
+
+    def test_concurrent_first_requests_create_one_client(self):
+        async def get_concurrently():
+            return await asyncio.gather(
+                *(
+                    ConnectionPoolManager.get_client("anthropic", base_url="https://b.test")
+                    for _ in range(5)
+                )
+            )
+
+        clients = asyncio.run(get_concurrently())
+
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        self.mock_async_client.assert_called_once()
+
+    def test_pool_is_usable_from_separate_event_loops(self):
+        asyncio.run(ConnectionPoolManager.get_client("openai", base_url="https://a.test"))
+        asyncio.run(ConnectionPoolManager.close_all())
+        asyncio.run(ConnectionPoolManager.get_client("google", base_url="https://c.test"))
+
+        self.assertEqual(list(ConnectionPoolManager._clients), ["google:https://c.test"])
+
+    def test_provider_auth_headers(self):
+        async def create_clients():
+            await ConnectionPoolManager.get_client(
+                "openai", base_url="https://a.test", api_key="k1"
+            )
+            await ConnectionPoolManager.get_client(
+                "anthropic", base_url="https://b.test", api_key="k2"
+            )
+            await ConnectionPoolManager.get_client(
+                "ollama", base_url="https://c.test", api_key="k3"
+            )
+
+        asyncio.run(create_clients())
+
+        headers = [call.kwargs["headers"] for call in self.mock_async_client.call_args_list]
+        self.assertEqual(
+            headers,
+            [
+                {"Authorization": "Bearer k1"},
+                {"x-api-key": "k2", "anthropic-version": "2023-06-01"},
+                {},
+            ],
+        )
+
+    def test_provider_timeouts(self):
+        async def create_clients():
+            await ConnectionPoolManager.get_client("anthropic", base_url="https://b.test")
+            await ConnectionPoolManager.get_client("ollama", base_url="https://c.test", timeout=7.0)
+
+        asyncio.run(create_clients())
+
+        timeouts = [call.kwargs["timeout"] for call in self.mock_async_client.call_args_list]
+        self.assertEqual(timeouts[0].read, 120.0)
+        self.assertEqual(timeouts[1], httpx.Timeout(7.0))
+
+
+class TestPooledOpenAIClient(unittest.IsolatedAsyncioTestCase):
+    async def test_chat_completion_stream_yields_event_payloads(self):
+        # Event boundaries deliberately fall in the middle of chunks
+        chunks = [
+            b'data: {"a": 1}\n\nda',
+            b'ta: {"b": "\xc3',
+            b'\xa9"}\r\n: ping\n',
+            b"data: [DONE]",
+        ]
+
+        async def stream_body():
+            for chunk in chunks:
+                yield chunk
+
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=stream_body()))
+        http_client = httpx.AsyncClient(base_url="https://api.test", transport=transport)
+        client = PooledOpenAIClient(api_key="test-key")
+
+        with patch.object(ConnectionPoolManager, "get_client", AsyncMock(return_value=http_client)):
+            events = [event async for event in client.chat_completion_stream(model="gpt-4o")]
+
+        await http_client.aclose()
+        self.assertEqual(events, ['{"a": 1}', '{"b": "\u00e9"}', "[DONE]"])
+
+    async def test_concurrent_first_requests_fetch_client_once(self):
+        client = PooledOpenAIClient(api_key="test-key")
+        http_client = AsyncMock()
+
+        with patch.object(
+            ConnectionPoolManager, "get_client", AsyncMock(return_value=http_client)
+        ) as mock_get_client:
+            clients = await asyncio.gather(*(client._get_client() for _ in range(5)))
+
+        self.assertTrue(all(c is http_client for c in clients))
+        mock_get_client.assert_awaited_once()
+
+    async def test_cancelled_first_request_does_not_break_the_client(self):
+        client = PooledOpenAIClient(api_key="test-key")
+        http_client = AsyncMock()
+        release = asyncio.Event()
+
+        async def slow_get_client(**kwargs):
+            await release.wait()
+            return http_client
+
+        with patch.object(ConnectionPoolManager, "get_client", side_effect=slow_get_client):
+            first = asyncio.create_task(client._get_client())
+            await asyncio.sleep(0)
+            first.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+
+            second = asyncio.create_task(client._get_client())
+            release.set()
+            self.assertIs(await second, http_client)
+
+    async def test_failed_fetch_is_retried(self):
+        client = PooledOpenAIClient(api_key="test-key")
+        http_client = AsyncMock()
+
+        with patch.object(
+            ConnectionPoolManager,
+            "get_client",
+            AsyncMock(side_effect=[httpx.ConnectError("down"), http_client]),
+        ):
+            with self.assertRaises(httpx.ConnectError):
+                await client._get_client()
+            self.assertIs(await client._get_client(), http_client)
+
+
+class TestConnectionPoolMetrics(unittest.TestCase):
+    def test_get_stats_without_requests(self):
+        stats = ConnectionPoolMetrics().get_stats()
+
+        self.assertEqual(stats["total_requests"], 0)
+        self.assertEqual(stats["average_request_time_ms"], 0)
+
+    def test_get_stats_averages_recorded_requests(self):
+        metrics = ConnectionPoolMetrics()
+        metrics.record_request(0.1)
+        metrics.record_request(0.3, connection_reused=True)
+
+        stats = metrics.get_stats()
+
+        self.assertEqual(stats["average_request_time_ms"], 200.0)
+        self.assertEqual(stats["connection_reuse_rate_percent"], 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
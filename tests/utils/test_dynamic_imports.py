@@ -0,0 +1,74 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Tests for the dynamic LLM client loader."""
+
+import unittest
+from unittest.mock import patch
+
+from trae_agent.utils.dynamic_imports import (
+    DynamicLLMClientLoader,
+    MissingDependencyError,
+    get_client_loader,
+)
+
+FIND_SPEC = "trae_agent.utils.dynamic_imports.importlib.util.find_spec"
+
+
+def find_spec_without(*missing_packages: str):
+    """Build a find_spec stand-in that reports the given packages as not installed."""
+    return lambda package: None if package in missing_packages else object()
+
+
+class TestDynamicLLMClientLoader(unittest.TestCase):
+    def test_unknown_provider_is_unavailable(self):
+        self.assertFalse(DynamicLLMClientLoader().is_provider_available("unknown"))
+
+    @patch("trae_agent.utils.dynamic_imports.importlib.import_module")
+    def test_availability_check_does_not_import_package(self, mock_import_module):
+        DynamicLLMClientLoader().is_provider_available("openai")
+
+        mock_import_module.assert_not_called()
+
+    @patch(FIND_SPEC, side_effect=find_spec_without("ollama"))
+    def test_missing_package_is_unavailable(self, mock_find_spec):
+        loader = DynamicLLMClientLoader()
+
+        self.assertFalse(loader.is_provider_available("ollama"))
+        self.assertTrue(loader.is_provider_available("openai"))
+
+    @patch(FIND_SPEC, side_effect=find_spec_without())
+    def test_availability_is_probed_once_per_package(self, mock_find_spec):
+        loader = DynamicLLMClientLoader()
+        for provider in loader.PROVIDER_DEPENDENCIES:
+            loader.is_provider_available(provider)
+
+        probed = sorted(call.args[0] for call in mock_find_spec.call_args_list)
+        self.assertEqual(probed, ["anthropic", "google.genai", "ollama", "openai"])
+
+    @patch(FIND_SPEC, side_effect=ModuleNotFoundError("No module named 'google'"))
+    def test_missing_parent_package_is_unavailable(self, mock_find_spec):
+        self.assertFalse(DynamicLLMClientLoader().is_provider_available("google"))
+
+    @patch(FIND_SPEC, side_effect=find_spec_without("ollama"))
+    def test_load_client_class_raises_for_missing_dependency(self, mock_find_spec):
+        with self.assertRaises(MissingDependencyError) as context:
+            DynamicLLMClientLoader().load_client_class("ollama")
+
+        self.assertEqual(context.exception.install_command, "pip install trae-agent[ollama]")
+
+    @patch(FIND_SPEC, side_effect=find_spec_without("ollama"))
+    def test_dependency_info(self, mock_find_spec):
+        info = DynamicLLMClientLoader().get_dependency_info()
+
+        self.assertEqual(info["missing_providers"], ["ollama"])
+        self.assertEqual(info["provider_count"]["available"], 6)
+        self.assertFalse(info["dependency_details"]["ollama"]["available"])
+        self.assertTrue(info["dependency_details"]["openai"]["available"])
+
+    def test_global_loader_is_created_once(self):
+        self.assertIs(get_client_loader(), get_client_loader())
+
+
+if __name__ == "__main__":
+    unittest.main()
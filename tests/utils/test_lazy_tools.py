@@ -0,0 +1,246 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Tests for lazy tool loading."""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from trae_agent.tools import tools_registry
+from trae_agent.utils.lazy_tools import LazyToolLoader, LazyToolProxy, OptimizedToolManager
+
+
+class TestLazyToolLoader(unittest.TestCase):
+    def setUp(self):
+        self.loader = LazyToolLoader(tools_registry, "openai")
+
+    def test_tools_are_not_instantiated_up_front(self):
+        self.assertEqual(self.loader.get_instantiated_tools(), [])
+
+    def test_get_tool_instantiates_once(self):
+        first = self.loader.get_tool("task_done")
+        second = self.loader.get_tool("task_done")
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loader.get_instantiated_tools(), [first])
+
+    def test_has_tool(self):
+        self.assertTrue(self.loader.has_tool("bash"))
+        self.assertFalse(self.loader.has_tool("unknown"))
+
+    def test_unknown_tool_raises(self):
+        with self.assertRaises(ValueError) as context:
+            self.loader.get_tool("unknown")
+
+        self.assertIn("task_done", str(context.exception))
+
+    def test_loading_stats(self):
+        for _ in range(3):
+            self.loader.get_tool("task_done")
+        self.loader.get_tool("bash")
+
+        stats = self.loader.get_loading_stats(detailed=True)
+
+        self.assertEqual(stats["instantiated_tools"], 2)
+        self.assertEqual(stats["most_used_tool"], "task_done")
+        self.assertEqual(stats["most_used_tool_accesses"], 3)
+        self.assertEqual(stats["detailed_stats"]["bash"]["access_count"], 1)
+
+    def test_loading_stats_omit_per_tool_details_by_default(self):
+        self.loader.get_tool("task_done")
+
+        self.assertNotIn("detailed_stats", self.loader.get_loading_stats())
+
+    def test_loading_stats_without_tools(self):
+        stats = self.loader.get_loading_stats()
+
+        self.assertEqual(stats["most_used_tool"], "none")
+        self.assertEqual(stats["average_load_time_ms"], 0)
+
+    def test_cleanup_unused_tools(self):
+        self.loader.get_tool("task_done")
+        self.loader.get_tool("task_done")
+        self.loader.get_tool("bash")
+
+        removed = self.loader.cleanup_unused_tools(min_access_count=2)
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(
+            list(self.loader.get_loading_stats(detailed=True)["detailed_stats"]), ["task_done"]
+        )
+
+    def test_removed_tool_is_reloaded_and_kept_tool_is_reused(self):
+        kept = self.loader.get_tool("task_done")
+        self.loader.get_tool("task_done")
+        removed = self.loader.get_tool("bash")
+
+        self.loader.cleanup_unused_tools(min_access_count=2)
+
+        self.assertIs(self.loader.get_tool("task_done"), kept)
+        self.assertIsNot(self.loader.get_tool("bash"), removed)
+        self.assertEqual(
+            self.loader.get_loading_stats(detailed=True)["detailed_stats"]["task_done"][
+                "access_count"
+            ],
+            3,
+        )
+
+
+class TestConcurrentPreload(unittest.TestCase):
+    def test_preload_builds_tools_concurrently_and_once_each(self):
+        # Each constructor waits for the other, so a serial preload would time out
+        barrier = threading.Barrier(2, timeout=5)
+        constructed = []
+
+        class SlowTool:
+            def __init__(self, model_provider=None):
+                constructed.append(type(self).__name__)
+                barrier.wait()
+
+        registry = {
+            "first": type("First", (SlowTool,), {}),
+            "second": type("Second", (SlowTool,), {}),
+        }
+        loader = LazyToolLoader(registry, "openai")
+
+        loader.preload_tools(["first", "second", "first"], parallel=True)
+
+        self.assertEqual(sorted(constructed), ["First", "Second"])
+        self.assertEqual(
+            loader.get_loading_stats(detailed=True)["detailed_stats"]["first"]["access_count"], 2
+        )
+
+    def test_preload_racing_get_tool_constructs_each_tool_once(self):
+        started = threading.Event()
+        release = threading.Event()
+        constructed = []
+
+        class SlowTool:
+            def __init__(self, model_provider=None):
+                constructed.append(type(self).__name__)
+                started.set()
+                release.wait(timeout=5)
+
+        registry = {
+            "first": type("First", (SlowTool,), {}),
+            "second": type("Second", (SlowTool,), {}),
+        }
+        loader = LazyToolLoader(registry, "openai")
+        preload = threading.Thread(
+            target=loader.preload_tools, args=(["first", "second"],), kwargs={"parallel": True}
+        )
+        preload.start()
+        started.wait(timeout=5)
+
+        # Both lookups race the preload while a constructor is still running
+        getters = [threading.Thread(target=loader.get_tool, args=(name,)) for name in registry]
+        for getter in getters:
+            getter.start()
+        release.set()
+        for thread in (preload, *getters):
+            thread.join(timeout=5)
+
+        self.assertEqual(sorted(constructed), ["First", "Second"])
+        self.assertEqual(
+            loader.get_loading_stats(detailed=True)["detailed_stats"]["first"]["access_count"], 2
+        )
+
+    def test_preload_is_serial_by_default(self):
+        loader = LazyToolLoader(tools_registry, "openai")
+
+        with patch("concurrent.futures.ThreadPoolExecutor") as mock_executor:
+            loader.preload_tools(["task_done", "bash"])
+
+        mock_executor.assert_not_called()
+        self.assertEqual(len(loader.get_instantiated_tools()), 2)
+
+
+class TestOptimizedToolManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = OptimizedToolManager(tools_registry, "openai")
+
+    def test_proxies_load_on_first_use(self):
+        (proxy,) = self.manager.get_tools_list(["task_done"])
+
+        self.assertEqual(proxy.name, "task_done")
+        self.assertEqual(
+            self.manager.get_performance_report()["memory_efficiency"]["tools_actually_loaded"], 0
+        )
+        self.assertTrue(proxy.get_input_schema())
+        self.assertEqual(
+            self.manager.get_performance_report()["memory_efficiency"]["tools_actually_loaded"], 1
+        )
+
+    def test_preload_skips_unregistered_tools(self):
+        registry = {"task_done": tools_registry["task_done"]}
+        manager = OptimizedToolManager(registry, "openai")
+
+        manager.preload_frequently_used_tools()
+
+        self.assertEqual(
+            manager.get_performance_report()["loading_performance"]["instantiated_tools"], 1
+        )
+
+    def test_loaded_proxy_delegates_without_reloading(self):
+        (proxy,) = self.manager.get_tools_list(["task_done"])
+        tool = self.manager.get_tool_by_name("task_done")
+
+        self.assertEqual(proxy.get_description(), tool.get_description())
+        self.assertEqual(proxy.get_name(), "task_done")
+        self.assertIsInstance(proxy, LazyToolProxy)
+        self.assertEqual(repr(proxy), "LazyToolProxy(task_done, loaded)")
+        self.assertEqual(
+            self.manager.get_performance_report()["loading_performance"]["most_used_tool_accesses"],
+            2,
+        )
+
+    def test_proxies_have_no_instance_dict(self):
+        (proxy,) = self.manager.get_tools_list(["task_done"])
+        proxy.get_name()
+
+        # hasattr() would be delegated to the tool, so look the attribute up on the proxy itself
+        with self.assertRaises(AttributeError):
+            object.__getattribute__(proxy, "__dict__")
+
+    def test_detailed_performance_report(self):
+        self.manager.get_tool_by_name("task_done")
+
+        self.assertNotIn(
+            "detailed_stats", self.manager.get_performance_report()["loading_performance"]
+        )
+        report = self.manager.get_detailed_performance_report()
+        self.assertEqual(
+            report["loading_performance"]["detailed_stats"]["task_done"]["access_count"], 1
+        )
+
+    def test_optimize_memory_drops_rarely_used_tools(self):
+        self.manager.get_tools_list(["task_done", "bash"])
+        self.manager.get_tool_by_name("task_done")
+        self.manager.get_tool_by_name("task_done")
+        self.manager.get_tool_by_name("bash")
+
+        result = self.manager.optimize_memory()
+
+        self.assertEqual(result, {"unused_tools_removed": 1})
+
+    def test_dropped_proxies_are_released(self):
+        kept = self.manager.get_tools_list(["task_done", "bash"])[0]
+
+        self.assertIs(self.manager.get_tools_list(["task_done"])[0], kept)
+        memory_efficiency = self.manager.get_performance_report()["memory_efficiency"]
+        self.assertEqual(memory_efficiency["live_proxies"], 1)
+        self.assertEqual(memory_efficiency["total_proxies_created"], 2)
+
+    def test_memory_savings_ignore_collected_proxies(self):
+        for name in ("task_done", "bash"):
+            self.manager.get_tools_list([name])[0].get_name()
+
+        memory_efficiency = self.manager.get_performance_report()["memory_efficiency"]
+
+        self.assertEqual(memory_efficiency["live_proxies"], 0)
+        self.assertEqual(memory_efficiency["memory_savings_percent"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,317 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Tests for OptimizedTrajectoryRecorder."""
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from trae_agent.utils import trajectory_recorder_optimized
+from trae_agent.utils.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.trajectory_recorder_optimized import OptimizedTrajectoryRecorder
+
+
+class TestOptimizedTrajectoryRecorder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trajectory_path = Path(self.temp_dir.name) / "trajectory.json"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_recorder(self, **kwargs) -> OptimizedTrajectoryRecorder:
+        kwargs.setdefault("background_io", False)
+        recorder = OptimizedTrajectoryRecorder(str(self.trajectory_path), **kwargs)
+        recorder.start_recording(task="test task", provider="openai", model="gpt-4o", max_steps=10)
+        return recorder
+
+    def record_interaction(self, recorder: OptimizedTrajectoryRecorder, content: str) -> None:
+        recorder.record_llm_interaction(
+            messages=[LLMMessage(role="user", content=content)],
+            response=LLMResponse(
+                content=f"reply to {content}",
+                usage=LLMUsage(input_tokens=10, output_tokens=5),
+                model="gpt-4o",
+                finish_reason="stop",
+            ),
+            provider="openai",
+            model="gpt-4o",
+        )
+
+    def load_trajectory(self) -> dict:
+        return json.loads(self.trajectory_path.read_text(encoding="utf-8"))
+
+    async def test_finalize_writes_complete_trajectory(self):
+        recorder = self.make_recorder(batch_size=100)
+        self.record_interaction(recorder, "first")
+        recorder.record_agent_step(step_number=1, state="completed", reflection="done")
+
+        await recorder.finalize_recording(success=True, final_result="ok")
+
+        data = self.load_trajectory()
+        self.assertEqual(data["task"], "test task")
+        self.assertTrue(data["success"])
+        self.assertEqual(data["final_result"], "ok")
+        self.assertEqual(len(data["llm_interactions"]), 1)
+        self.assertEqual(data["llm_interactions"][0]["response"]["usage"]["input_tokens"], 10)
+        self.assertEqual(data["agent_steps"][0]["reflection"], "done")
+
+    async def test_records_usage_fields(self):
+        recorder = self.make_recorder(batch_size=100)
+        response = LLMResponse(
+            content="reply",
+            usage=LLMUsage(input_tokens=10, output_tokens=5, cache_read_input_tokens=3),
+            model="gpt-4o",
+            finish_reason="stop",
+        )
+        recorder.record_llm_interaction(
+            messages=[], response=response, provider="openai", model="gpt-4o"
+        )
+        recorder.record_agent_step(step_number=1, state="thinking", llm_response=response)
+        recorder.record_agent_step(
+            step_number=2,
+            state="thinking",
+            llm_response=LLMResponse(content="reply", usage=None),
+        )
+
+        usage = recorder.get_llm_interactions()[0]["response"]["usage"]
+        self.assertEqual(usage["cache_read_input_tokens"], 3)
+        self.assertEqual(usage["reasoning_tokens"], 0)
+        steps = recorder.get_agent_steps()
+        self.assertEqual(
+            steps[0]["llm_response"]["usage"], {"input_tokens": 10, "output_tokens": 5}
+        )
+        self.assertIsNone(steps[1]["llm_response"]["usage"])
+
+    async def test_batch_size_triggers_save(self):
+        recorder = self.make_recorder(batch_size=2)
+        self.record_interaction(recorder, "first")
+        self.assertFalse(self.trajectory_path.exists())
+
+        self.record_interaction(recorder, "second")
+
+        self.assertEqual(len(self.load_trajectory()["llm_interactions"]), 2)
+
+    async def test_max_interactions_keeps_most_recent(self):
+        recorder = self.make_recorder(batch_size=100, max_interactions=2)
+        for content in ("first", "second", "third"):
+            self.record_interaction(recorder, content)
+
+        await recorder.finalize_recording(success=True)
+
+        contents = [
+            interaction["input_messages"][0]["content"]
+            for interaction in self.load_trajectory()["llm_interactions"]
+        ]
+        self.assertEqual(contents, ["second", "third"])
+
+    async def test_evicted_records_are_spilled_to_sidecar(self):
+        recorder = self.make_recorder(batch_size=100, max_interactions=2)
+        for content in ("first", "second", "third", "fourth"):
+            self.record_interaction(recorder, content)
+        for step_number in (1, 2, 3):
+            recorder.record_agent_step(step_number=step_number, state="completed")
+
+        await recorder.finalize_recording(success=True)
+
+        lines = recorder.evicted_records_path.read_text(encoding="utf-8").splitlines()
+        spilled = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [(entry["type"], entry["record"].get("step_number")) for entry in spilled],
+            [("llm_interactions", None), ("llm_interactions", None), ("agent_steps", 1)],
+        )
+        self.assertEqual(spilled[1]["record"]["input_messages"][0]["content"], "second")
+
+    async def test_new_recording_discards_previous_sidecar(self):
+        recorder = self.make_recorder(batch_size=100, max_interactions=1)
+        for content in ("first", "second"):
+            self.record_interaction(recorder, content)
+        recorder.cleanup()
+        self.assertTrue(recorder.evicted_records_path.exists())
+
+        recorder.start_recording(task="again", provider="openai", model="gpt-4o", max_steps=10)
+
+        self.assertFalse(recorder.evicted_records_path.exists())
+
+    async def test_save_reuses_encoded_records(self):
+        recorder = self.make_recorder(batch_size=100)
+        for content in ("first", "second"):
+            self.record_interaction(recorder, content)
+        recorder.record_agent_step(step_number=1, state="completed")
+
+        with patch(
+            "trae_agent.utils.trajectory_recorder_optimized._dump_json",
+            wraps=trajectory_recorder_optimized._dump_json,
+        ) as mock_dump_json:
+            recorder.save_trajectory()
+
+        # Only the envelope is encoded; records were encoded when they were recorded
+        mock_dump_json.assert_called_once()
+        data = self.load_trajectory()
+        self.assertEqual(len(data["llm_interactions"]), 2)
+        self.assertEqual(data["agent_steps"][0]["state"], "completed")
+
+    async def test_unchanged_trajectory_is_not_saved_again(self):
+        recorder = self.make_recorder(batch_size=100)
+        self.record_interaction(recorder, "first")
+        recorder.save_trajectory()
+
+        with patch.object(
+            recorder, "_encode_trajectory", wraps=recorder._encode_trajectory
+        ) as mock_encode:
+            recorder.save_trajectory()
+            mock_encode.assert_not_called()
+
+            self.record_interaction(recorder, "second")
+            recorder.save_trajectory()
+            mock_encode.assert_called_once()
+
+    async def test_failed_save_keeps_previous_trajectory(self):
+        recorder = self.make_recorder(batch_size=100)
+        self.record_interaction(recorder, "first")
+        recorder.save_trajectory()
+        self.record_interaction(recorder, "second")
+
+        with patch(
+            "trae_agent.utils.trajectory_recorder_optimized.os.write",
+            side_effect=OSError("disk full"),
+        ):
+            recorder.save_trajectory()
+
+        self.assertEqual(len(self.load_trajectory()["llm_interactions"]), 1)
+        self.assertEqual(list(self.trajectory_path.parent.iterdir()), [self.trajectory_path])
+
+    async def test_unencodable_record_is_skipped_with_warning(self):
+        recorder = self.make_recorder(batch_size=100)
+        recorder.record_agent_step(step_number=1, state="completed")
+
+        with (
+            patch(
+                "trae_agent.utils.trajectory_recorder_optimized._dump_json",
+                side_effect=TypeError("not serializable"),
+            ),
+            patch("builtins.print") as mock_print,
+        ):
+            recorder.record_agent_step(step_number=2, state="error", error="boom")
+
+        mock_print.assert_called_once()
+        recorder.record_agent_step(step_number=3, state="completed")
+        await recorder.finalize_recording(success=False)
+
+        steps = self.load_trajectory()["agent_steps"]
+        self.assertEqual([step["step_number"] for step in steps], [1, 3])
+        self.assertEqual(len(recorder.get_agent_steps()), 2)
+
+    async def test_skipped_record_and_eviction_keep_history_and_sidecar_aligned(self):
+        recorder = self.make_recorder(batch_size=100, max_interactions=2)
+        recorder.record_agent_step(step_number=1, state="completed")
+        with patch(
+            "trae_agent.utils.trajectory_recorder_optimized._dump_json",
+            side_effect=TypeError("not serializable"),
+        ):
+            recorder.record_agent_step(step_number=2, state="error")
+        for step_number in (3, 4):
+            recorder.record_agent_step(step_number=step_number, state="completed")
+
+        await recorder.finalize_recording(success=True)
+
+        self.assertEqual([step["step_number"] for step in recorder.get_agent_steps()], [3, 4])
+        saved = [step["step_number"] for step in self.load_trajectory()["agent_steps"]]
+        self.assertEqual(saved, [3, 4])
+        spilled = json.loads(recorder.evicted_records_path.read_text(encoding="utf-8"))
+        self.assertEqual(spilled["record"]["step_number"], 1)
+
+    async def test_background_saves_are_coalesced(self):
+        recorder = self.make_recorder(batch_size=1, background_io=True)
+        save_started = threading.Event()
+        release_save = threading.Event()
+
+        def slow_save():
+            save_started.set()
+            release_save.wait()
+
+        with patch.object(recorder, "save_trajectory", side_effect=slow_save) as mock_save:
+            self.record_interaction(recorder, "first")
+            save_started.wait()
+            # Both rollovers arrive while the first save is still running
+            self.record_interaction(recorder, "second")
+            self.record_interaction(recorder, "third")
+            release_save.set()
+            recorder.cleanup()
+
+        self.assertEqual(mock_save.call_count, 2)
+
+    async def test_writer_thread_starts_on_first_background_save(self):
+        recorder = self.make_recorder(batch_size=2, background_io=True)
+        self.record_interaction(recorder, "first")
+        self.assertIsNone(recorder._writer)
+
+        self.record_interaction(recorder, "second")
+        self.assertIsNotNone(recorder._writer)
+
+        recorder.cleanup()
+        self.assertIsNone(recorder._writer)
+        self.assertEqual(len(self.load_trajectory()["llm_interactions"]), 2)
+
+    async def test_saves_after_cleanup_are_synchronous(self):
+        recorder = self.make_recorder(batch_size=1, background_io=True)
+        recorder.cleanup()
+
+        self.record_interaction(recorder, "first")
+
+        self.assertIsNone(recorder._writer)
+        self.assertEqual(len(self.load_trajectory()["llm_interactions"]), 1)
+
+    async def test_background_finalize_writes_complete_trajectory(self):
+        recorder = self.make_recorder(batch_size=1, background_io=True)
+        for content in ("first", "second"):
+            self.record_interaction(recorder, content)
+
+        await recorder.finalize_recording(success=True)
+        recorder.cleanup()
+
+        data = self.load_trajectory()
+        self.assertTrue(data["success"])
+        self.assertEqual(len(data["llm_interactions"]), 2)
+
+    @patch("trae_agent.utils.trajectory_recorder_optimized.orjson", None)
+    async def test_save_without_orjson(self):
+        recorder = self.make_recorder(batch_size=100)
+        self.record_interaction(recorder, "caf\u00e9")
+
+        await recorder.finalize_recording(success=True)
+
+        data = self.load_trajectory()
+        self.assertEqual(data["llm_interactions"][0]["input_messages"][0]["content"], "caf\u00e9")
+
+    @patch("trae_agent.utils.trajectory_recorder_optimized.orjson", None)
+    async def test_non_json_values_are_stringified_without_orjson(self):
+        recorder = self.make_recorder(batch_size=100, max_interactions=1)
+        for step_number in (1, 2):
+            recorder.record_agent_step(
+                step_number=step_number, state="error", error=Path("missing.txt")
+            )
+
+        await recorder.finalize_recording(success=False)
+
+        self.assertEqual(self.load_trajectory()["agent_steps"][0]["error"], "missing.txt")
+        spilled = json.loads(recorder.evicted_records_path.read_text(encoding="utf-8"))
+        self.assertEqual(spilled["record"]["error"], "missing.txt")
+
+    @patch("trae_agent.utils.trajectory_recorder_optimized.orjson", None)
+    async def test_spill_without_orjson(self):
+        recorder = self.make_recorder(batch_size=100, max_interactions=1)
+        for content in ("caf\u00e9", "second"):
+            self.record_interaction(recorder, content)
+        recorder.cleanup()
+
+        spilled = json.loads(recorder.evicted_records_path.read_text(encoding="utf-8"))
+        self.assertEqual(spilled["record"]["input_messages"][0]["content"], "caf\u00e9")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,11 +9,30 @@
 # pyright: reportUnknownVariableType=false
 
 import json
+import mmap
 import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, override
 
+try:
+    import orjson
+except ImportError:  # optional speedup, installed with trae-agent[performance]
+    orjson = None
+
+# Config files at least this large are memory-mapped instead of read into a buffer
+_MMAP_READ_THRESHOLD = 16 * 1024
+
+
+def _read_config_file(config_path: Path) -> Any:
+    """Parse a JSON config file, preferring orjson and mmap for large files."""
+    with open(config_path, "rb") as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size >= _MMAP_READ_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
 # data class for model parameters
 @dataclass
@@ -60,8 +79,7 @@ class Config:
             config_path = Path(config_or_config_file)
             if config_path.exists():
                 try:
-                    with open(config_path, "r") as f:
-                        self._config = json.load(f)
+                    self._config = _read_config_file(config_path)
                 except Exception as e:
                     print(f"Warning: Could not load config file {config_or_config_file}: {e}")
                     self._config = {}
@@ -3,26 +3,50 @@
 
 """Configuration caching system for improved CLI startup performance."""
 
-import json
+import functools
 import hashlib
+import mmap
+import os
+import pickle
+import sys
+import tempfile
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, Optional
-from functools import lru_cache
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 from .config import Config
 
+# The file hash only detects changes, so a fast non-cryptographic digest is enough
+try:
+    import xxhash
+    _new_file_hasher = xxhash.xxh3_64
+except ImportError:  # optional speedup, installed with trae-agent[performance]
+    _new_file_hasher = functools.partial(hashlib.blake2b, digest_size=16)
+
+# Files at least this large are hashed through mmap instead of buffered reads
+_MMAP_HASH_THRESHOLD = 64 * 1024
+
+# Setting this environment variable to a file path turns on the on-disk cache for the
+# global cache. It is off by default: for typical small config files, unpickling costs
+# more than parsing the JSON again, and it only pays off for very large files.
+PERSISTENT_CACHE_ENV_VAR = "TRAE_AGENT_CONFIG_CACHE_FILE"
+
+# Pickles written by another interpreter or in an older format are ignored
+_PERSISTENT_CACHE_VERSION = (2, sys.version_info[:2])
+
 
 @dataclass
 class ConfigCacheEntry:
     """Represents a cached configuration entry."""
-    config_data: Dict[str, Any]
+    # The parsed file contents; each hit builds a fresh Config from them
+    raw_config: Dict[str, Any]
     file_hash: str
-    file_mtime: float
+    file_mtime_ns: int
+    file_size: int
     cache_time: float
     access_count: int = 0
-    last_access: float = 0.0
 
 
 class ConfigurationCache:
@@ -36,23 +60,43 @@ class ConfigurationCache:
     - Thread-safe operations
     """
     
-    def __init__(self, max_cache_size: int = 32, cache_ttl_seconds: float = 3600):
+    def __init__(
+        self,
+        max_cache_size: int = 32,
+        cache_ttl_seconds: float = 3600,
+        strict_hash_check: bool = False,
+        persistent_cache_file: Optional[Path] = None
+    ):
         """
         Initialize configuration cache.
         
         Args:
             max_cache_size: Maximum number of configs to cache
             cache_ttl_seconds: Time-to-live for cache entries (1 hour default)
+            strict_hash_check: Re-hash the file on every hit, even when mtime and size match
+            persistent_cache_file: Pickle file used to keep entries across processes
+                (None = in-memory only). It holds the parsed contents of each cached
+                config file, including any API keys in them, and is created readable
+                by the owner only.
         """
         self.max_cache_size = max_cache_size
         self.cache_ttl = cache_ttl_seconds
-        self._cache: Dict[str, ConfigCacheEntry] = {}
+        self.strict_hash_check = strict_hash_check
+        # Insertion order doubles as recency order: most recently used entries live at the end
+        self._cache: OrderedDict[str, ConfigCacheEntry] = OrderedDict()
         self._cache_stats = {
             "hits": 0,
             "misses": 0,
             "invalidations": 0,
             "evictions": 0
         }
+        self.persistent_cache_file = (
+            Path(persistent_cache_file) if persistent_cache_file is not None else None
+        )
+        # What the persistent cache file currently holds, to skip rewriting it unchanged
+        self._persisted_state: Dict[str, tuple[str, int, int]] = {}
+        if self.persistent_cache_file is not None:
+            self._load_persistent_cache()
     
     def get_config(self, config_file: str) -> Optional[Config]:
         """
@@ -68,49 +112,45 @@ class ConfigurationCache:
         cache_key = str(config_path.absolute())
         
         # Check if we have a cached entry
-        if cache_key not in self._cache:
+        entry = self._cache.get(cache_key)
+        if entry is None:
             self._cache_stats["misses"] += 1
             return None
         
-        entry = self._cache[cache_key]
         current_time = time.time()
         
         # Check TTL
         if current_time - entry.cache_time > self.cache_ttl:
-            del self._cache[cache_key]
-            self._cache_stats["invalidations"] += 1
-            self._cache_stats["misses"] += 1
+            self._invalidate(cache_key)
             return None
         
-        # Check if file exists and hasn't changed
-        if not config_path.exists():
-            del self._cache[cache_key]
-            self._cache_stats["invalidations"] += 1
-            self._cache_stats["misses"] += 1
-            return None
-        
-        current_mtime = config_path.stat().st_mtime
-        if current_mtime != entry.file_mtime:
-            del self._cache[cache_key]
-            self._cache_stats["invalidations"] += 1
-            self._cache_stats["misses"] += 1
+        # A single stat both checks existence and detects changes
+        try:
+            st = os.stat(cache_key)
+        except (FileNotFoundError, NotADirectoryError):
+            self._invalidate(cache_key)
             return None
         
-        # Verify file content hash
-        current_hash = self._compute_file_hash(config_path)
-        if current_hash != entry.file_hash:
-            del self._cache[cache_key]
-            self._cache_stats["invalidations"] += 1
-            self._cache_stats["misses"] += 1
-            return None
+        # Matching mtime and size means the file is unchanged; the hash is only a
+        # tie-breaker for files that were touched without being edited
+        file_moved = (st.st_mtime_ns, st.st_size) != (entry.file_mtime_ns, entry.file_size)
+        if file_moved or self.strict_hash_check:
+            current_hash = self._compute_file_hash(config_path)
+            if current_hash != entry.file_hash:
+                self._invalidate(cache_key)
+                return None
+            entry.file_mtime_ns = st.st_mtime_ns
+            entry.file_size = st.st_size
         
         # Cache hit! Update access statistics
         entry.access_count += 1
-        entry.last_access = current_time
+        self._cache.move_to_end(cache_key)
         self._cache_stats["hits"] += 1
         
-        # Reconstruct Config from cached data
-        return Config(entry.config_data)
+        # The CLI overrides nested fields such as model_parameters.api_key. Building a
+        # new Config from the parsed dict gives each caller its own ModelParameters and
+        # LakeviewConfig, and costs about a tenth of a deepcopy of the whole instance.
+        return Config(entry.raw_config)
     
     def cache_config(self, config_file: str, config: Config) -> None:
         """
@@ -125,87 +165,152 @@ class ConfigurationCache:
         current_time = time.time()
         
         # Prepare cache entry
-        if config_path.exists():
-            file_hash = self._compute_file_hash(config_path)
-            file_mtime = config_path.stat().st_mtime
-        else:
+        try:
+            st = os.stat(cache_key)
+        except (FileNotFoundError, NotADirectoryError):
             # For in-memory configs
             file_hash = ""
-            file_mtime = 0.0
-        
-        # Convert config to cacheable data
-        config_data = self._config_to_dict(config)
+            file_mtime_ns = 0
+            file_size = 0
+        else:
+            file_hash = self._compute_file_hash(config_path)
+            file_mtime_ns = st.st_mtime_ns
+            file_size = st.st_size
         
         entry = ConfigCacheEntry(
-            config_data=config_data,
+            # Only the file's own data is kept, so overrides already applied to the
+            # caller's instance are not cached
+            raw_config=config._config,
             file_hash=file_hash,
-            file_mtime=file_mtime,
+            file_mtime_ns=file_mtime_ns,
+            file_size=file_size,
             cache_time=current_time,
-            access_count=1,
-            last_access=current_time
+            access_count=1
         )
         
-        # Evict oldest entry if cache is full
-        if len(self._cache) >= self.max_cache_size:
-            self._evict_oldest_entry()
-        
         self._cache[cache_key] = entry
+        self._cache.move_to_end(cache_key)
+        
+        # Evict the least recently used entry if cache is full
+        if len(self._cache) > self.max_cache_size:
+            self._cache.popitem(last=False)
+            self._cache_stats["evictions"] += 1
+        
+        # Re-caching an unchanged file leaves the persisted entries as they are
+        if (
+            self.persistent_cache_file is not None
+            and self._persistable_state() != self._persisted_state
+        ):
+            self._save_persistent_cache()
     
-    def _compute_file_hash(self, file_path: Path) -> str:
-        """Compute SHA-256 hash of file content."""
-        try:
-            with open(file_path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
-        except Exception:
-            return ""
-    
-    def _config_to_dict(self, config: Config) -> Dict[str, Any]:
-        """Convert Config object to dictionary for caching."""
-        # Extract the key components of the config
+    def _persistable_state(self) -> Dict[str, tuple[str, int, int]]:
+        """Identify the entries the persistent cache file would hold."""
+        # In-memory configs have no file to validate against in the next process
         return {
-            "default_provider": config.default_provider,
-            "max_steps": config.max_steps,
-            "enable_lakeview": config.enable_lakeview,
-            "model_providers": {
-                name: {
-                    "model": params.model,
-                    "api_key": params.api_key,
-                    "max_tokens": params.max_tokens,
-                    "temperature": params.temperature,
-                    "top_p": params.top_p,
-                    "top_k": params.top_k,
-                    "parallel_tool_calls": params.parallel_tool_calls,
-                    "max_retries": params.max_retries,
-                    "base_url": params.base_url,
-                    "api_version": params.api_version,
-                    "candidate_count": params.candidate_count,
-                    "stop_sequences": params.stop_sequences,
-                }
-                for name, params in config.model_providers.items()
-            },
-            "lakeview_config": {
-                "model_provider": config.lakeview_config.model_provider,
-                "model_name": config.lakeview_config.model_name,
-            } if config.lakeview_config else None
+            key: (entry.file_hash, entry.file_mtime_ns, entry.file_size)
+            for key, entry in self._cache.items()
+            if entry.file_hash
         }
     
-    def _evict_oldest_entry(self) -> None:
-        """Evict the least recently used cache entry."""
-        if not self._cache:
+    def _load_persistent_cache(self) -> None:
+        """Load entries persisted by a previous process, keeping only still-valid ones."""
+        try:
+            with open(self.persistent_cache_file, "rb") as f:
+                payload = pickle.load(f)
+        except Exception:
+            # A missing, corrupt or incompatible cache file is treated as empty
             return
         
-        oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k].last_access)
-        del self._cache[oldest_key]
-        self._cache_stats["evictions"] += 1
+        if not isinstance(payload, dict) or payload.get("version") != _PERSISTENT_CACHE_VERSION:
+            return
+        
+        current_time = time.time()
+        for cache_key, record in payload.get("entries", {}).items():
+            if current_time - record["cache_time"] > self.cache_ttl:
+                continue
+            try:
+                st = os.stat(cache_key)
+            except OSError:
+                continue
+            if (st.st_mtime_ns, st.st_size) != (record["file_mtime_ns"], record["file_size"]):
+                continue
+            # Only the parsed file contents were persisted; hits build Config from them
+            self._cache[cache_key] = ConfigCacheEntry(
+                raw_config=record["raw_config"],
+                file_hash=record["file_hash"],
+                file_mtime_ns=record["file_mtime_ns"],
+                file_size=record["file_size"],
+                cache_time=record["cache_time"],
+            )
+        
+        while len(self._cache) > self.max_cache_size:
+            self._cache.popitem(last=False)
+        self._persisted_state = self._persistable_state()
+    
+    def _save_persistent_cache(self) -> None:
+        """Atomically write the current entries to the persistent cache file."""
+        # Only the parsed file contents are persisted, never a Config instance, so
+        # overrides applied after loading (CLI flags, environment keys) stay in memory.
+        # In-memory configs have no file to validate against in the next process.
+        entries = {
+            key: {
+                "raw_config": entry.raw_config,
+                "file_hash": entry.file_hash,
+                "file_mtime_ns": entry.file_mtime_ns,
+                "file_size": entry.file_size,
+                "cache_time": entry.cache_time,
+            }
+            for key, entry in self._cache.items()
+            if entry.file_hash
+        }
+        payload = {"version": _PERSISTENT_CACHE_VERSION, "entries": entries}
+        cache_dir = self.persistent_cache_file.parent
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.persistent_cache_file)
+                self._persisted_state = self._persistable_state()
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception:
+            # Persisting is best-effort; the in-memory cache remains valid
+            pass
+    
+    def _invalidate(self, cache_key: str) -> None:
+        """Drop a stale entry and count the lookup as a miss."""
+        del self._cache[cache_key]
+        self._cache_stats["invalidations"] += 1
+        self._cache_stats["misses"] += 1
+    
+    def _compute_file_hash(self, file_path: Path) -> str:
+        """Compute a fingerprint of file content."""
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < _MMAP_HASH_THRESHOLD:
+                    return hashlib.file_digest(f, _new_file_hasher).hexdigest()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hasher = _new_file_hasher()
+                    hasher.update(mm)
+                    return hasher.hexdigest()
+        except Exception:
+            return ""
     
     def clear_cache(self) -> None:
         """Clear all cached configurations."""
         self._cache.clear()
+        self._persisted_state = {}
+        if self.persistent_cache_file is not None:
+            self.persistent_cache_file.unlink(missing_ok=True)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
         total_requests = self._cache_stats["hits"] + self._cache_stats["misses"]
         hit_rate = (self._cache_stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+        current_time = time.time()
         
         return {
             "cache_size": len(self._cache),
@@ -219,8 +324,7 @@ class ConfigurationCache:
                 {
                     "file": key,
                     "access_count": entry.access_count,
-                    "cache_age_seconds": round(time.time() - entry.cache_time, 2),
-                    "last_access_seconds_ago": round(time.time() - entry.last_access, 2)
+                    "cache_age_seconds": round(current_time - entry.cache_time, 2)
                 }
                 for key, entry in self._cache.items()
             ]
@@ -232,9 +336,8 @@ class ConfigurationCache:
         stale_keys = []
         
         for key, entry in self._cache.items():
-            # Remove entries older than TTL or not accessed recently
-            if (current_time - entry.cache_time > self.cache_ttl or 
-                current_time - entry.last_access > self.cache_ttl / 2):
+            # Remove entries older than TTL
+            if current_time - entry.cache_time > self.cache_ttl:
                 stale_keys.append(key)
         
         for key in stale_keys:
@@ -246,14 +349,13 @@ class ConfigurationCache:
         }
 
 
-# Global cache instance
-_global_config_cache = ConfigurationCache()
-
-
-@lru_cache(maxsize=128)
-def _get_config_file_key(config_file: str, file_mtime: float) -> str:
-    """Create a cache key that includes file modification time."""
-    return f"{config_file}:{file_mtime}"
+# The global cache is built on first use so importing this module doesn't read the cache file
+@functools.cache
+def _global_config_cache() -> ConfigurationCache:
+    """Get the global configuration cache."""
+    # Persisting across processes is opt-in; see PERSISTENT_CACHE_ENV_VAR
+    persistent_cache_file = os.environ.get(PERSISTENT_CACHE_ENV_VAR) or None
+    return ConfigurationCache(persistent_cache_file=persistent_cache_file)
 
 
 def load_config_cached(config_file: str = "trae_config.json") -> Config:
@@ -270,7 +372,7 @@ def load_config_cached(config_file: str = "trae_config.json") -> Config:
         Config object
     """
     # Try to get from cache first
-    cached_config = _global_config_cache.get_config(config_file)
+    cached_config = _global_config_cache().get_config(config_file)
     if cached_config is not None:
         return cached_config
     
@@ -278,24 +380,24 @@ def load_config_cached(config_file: str = "trae_config.json") -> Config:
     config = Config(config_file)
     
     # Cache the loaded config
-    _global_config_cache.cache_config(config_file, config)
+    _global_config_cache().cache_config(config_file, config)
     
     return config
 
 
 def get_config_cache_stats() -> Dict[str, Any]:
     """Get global configuration cache statistics."""
-    return _global_config_cache.get_cache_stats()
+    return _global_config_cache().get_cache_stats()
 
 
 def clear_config_cache() -> None:
     """Clear the global configuration cache."""
-    _global_config_cache.clear_cache()
+    _global_config_cache().clear_cache()
 
 
 def optimize_config_cache() -> Dict[str, int]:
     """Optimize the global configuration cache."""
-    return _global_config_cache.optimize_cache()
+    return _global_config_cache().optimize_cache()
 
 
 # Performance timer decorator for config loading
@@ -304,20 +406,21 @@ class ConfigLoadTimer:
     
     def __init__(self, description: str = "Config loading"):
         self.description = description
-        self.start_time = 0.0
-        self.end_time = 0.0
+        # Integer nanoseconds; converted to milliseconds only when read
+        self.start_time = 0
+        self.end_time = 0
     
     def __enter__(self):
-        self.start_time = time.perf_counter()
+        self.start_time = time.perf_counter_ns()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = time.perf_counter()
+        self.end_time = time.perf_counter_ns()
     
     @property
     def duration_ms(self) -> float:
         """Get the duration in milliseconds."""
-        return (self.end_time - self.start_time) * 1000
+        return (self.end_time - self.start_time) / 1_000_000
     
     def __str__(self) -> str:
         return f"{self.description}: {self.duration_ms:.2f}ms"
\ No newline at end of file
@@ -5,10 +5,40 @@
 
 import httpx
 import asyncio
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from contextlib import asynccontextmanager
 
 
+# Provider-specific authentication headers, keyed by provider name
+_PROVIDER_HEADER_BUILDERS: Dict[str, Callable[[str], Dict[str, str]]] = {
+    "openai": lambda api_key: {"Authorization": f"Bearer {api_key}"},
+    "anthropic": lambda api_key: {"x-api-key": api_key, "anthropic-version": "2023-06-01"},
+    "google": lambda api_key: {"Authorization": f"Bearer {api_key}"},
+}
+
+# Provider-specific timeout optimizations; other providers use the caller's timeout
+_PROVIDER_TIMEOUTS: Dict[str, httpx.Timeout] = {
+    "openai": httpx.Timeout(
+        connect=10.0,
+        read=60.0,  # Longer read timeout for streaming
+        write=10.0,
+        pool=5.0
+    ),
+    "anthropic": httpx.Timeout(
+        connect=10.0,
+        read=120.0,  # Anthropic can be slower
+        write=10.0,
+        pool=5.0
+    ),
+    "google": httpx.Timeout(
+        connect=10.0,
+        read=90.0,
+        write=10.0,
+        pool=5.0
+    ),
+}
+
+
 class ConnectionPoolManager:
     """
     Manages HTTP connection pools for different LLM providers.
@@ -22,13 +52,24 @@ class ConnectionPoolManager:
     
     _instance: Optional['ConnectionPoolManager'] = None
     _clients: Dict[str, httpx.AsyncClient] = {}
-    _lock = asyncio.Lock()
+    # Created lazily so the lock is bound to the loop that actually uses it
+    _lock: Optional[asyncio.Lock] = None
+    _lock_loop: Optional[asyncio.AbstractEventLoop] = None
     
     def __new__(cls) -> 'ConnectionPoolManager':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
     
+    @classmethod
+    def _get_lock(cls) -> asyncio.Lock:
+        """Get the client-creation lock for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if cls._lock is None or cls._lock_loop is not loop:
+            cls._lock = asyncio.Lock()
+            cls._lock_loop = loop
+        return cls._lock
+    
     @classmethod
     async def get_client(
         cls, 
@@ -40,47 +81,23 @@ class ConnectionPoolManager:
         max_keepalive_connections: int = 5
     ) -> httpx.AsyncClient:
         """Get or create an HTTP client for the specified provider."""
-        instance = cls()
+        client_key = f"{provider}:{base_url or 'default'}"
         
-        async with cls._lock:
-            client_key = f"{provider}:{base_url or 'default'}"
-            
+        # Fast path: pooled clients are returned without taking the lock
+        client = cls._clients.get(client_key)
+        if client is not None:
+            return client
+        
+        async with cls._get_lock():
+            # Re-check in case another task created the client while we waited
             if client_key not in cls._clients:
                 # Create optimized client for the provider
-                headers = {}
-                if api_key:
-                    if provider == "openai":
-                        headers["Authorization"] = f"Bearer {api_key}"
-                    elif provider == "anthropic":
-                        headers["x-api-key"] = api_key
-                        headers["anthropic-version"] = "2023-06-01"
-                    elif provider == "google":
-                        headers["Authorization"] = f"Bearer {api_key}"
+                build_headers = _PROVIDER_HEADER_BUILDERS.get(provider)
+                headers = build_headers(api_key) if api_key and build_headers else {}
                 
-                # Provider-specific timeout optimizations
-                provider_timeouts = {
-                    "openai": httpx.Timeout(
-                        connect=10.0,
-                        read=60.0,  # Longer read timeout for streaming
-                        write=10.0,
-                        pool=5.0
-                    ),
-                    "anthropic": httpx.Timeout(
-                        connect=10.0,
-                        read=120.0,  # Anthropic can be slower
-                        write=10.0,
-                        pool=5.0
-                    ),
-                    "google": httpx.Timeout(
-                        connect=10.0,
-                        read=90.0,
-                        write=10.0,
-                        pool=5.0
-                    ),
-                    "default": httpx.Timeout(timeout)
-                }
-                
-                timeout_config = provider_timeouts.get(provider, provider_timeouts["default"])
+                timeout_config = _PROVIDER_TIMEOUTS.get(provider)
+                if timeout_config is None:
+                    timeout_config = httpx.Timeout(timeout)
                 
                 cls._clients[client_key] = httpx.AsyncClient(
                     base_url=base_url,
@@ -102,7 +119,7 @@ class ConnectionPoolManager:
     @classmethod
     async def close_all(cls) -> None:
         """Close all HTTP clients and clean up resources."""
-        async with cls._lock:
+        async with cls._get_lock():
             for client in cls._clients.values():
                 await client.aclose()
             cls._clients.clear()
@@ -126,29 +143,44 @@ class PooledOpenAIClient:
     def __init__(self, api_key: str, base_url: Optional[str] = None):
         self.api_key = api_key
         self.base_url = base_url or "https://api.openai.com/v1"
-        self._client = None
+        self._client: Optional[httpx.AsyncClient] = None
+        # Shared by concurrent first requests so the client is only fetched once
+        self._client_task: Optional[asyncio.Task] = None
     
     async def _get_client(self) -> httpx.AsyncClient:
         """Get pooled HTTP client for OpenAI."""
-        if self._client is None:
-            self._client = await ConnectionPoolManager.get_client(
-                provider="openai",
-                base_url=self.base_url,
-                api_key=self.api_key,
-                max_connections=15,  # Higher for OpenAI
-                max_keepalive_connections=8
+        if self._client is not None:
+            return self._client
+        
+        if self._client_task is None:
+            self._client_task = asyncio.create_task(
+                ConnectionPoolManager.get_client(
+                    provider="openai",
+                    base_url=self.base_url,
+                    api_key=self.api_key,
+                    max_connections=15,  # Higher for OpenAI
+                    max_keepalive_connections=8
+                )
             )
+        
+        task = self._client_task
+        try:
+            # Shielded so a cancelled caller doesn't cancel the fetch other callers share
+            self._client = await asyncio.shield(task)
+        except BaseException:
+            # Let the next request retry instead of re-raising a cached failure
+            failed = task.done() and (task.cancelled() or task.exception() is not None)
+            if failed and self._client_task is task:
+                self._client_task = None
+            raise
         return self._client
     
     async def chat_completion(self, **kwargs) -> dict:
         """Make a chat completion request with pooled connection."""
         client = await self._get_client()
         
-        response = await client.post(
-            "/chat/completions",
-            json=kwargs,
-            headers={"Content-Type": "application/json"}
-        )
+        # httpx sets Content-Type: application/json for json= bodies
+        response = await client.post("/chat/completions", json=kwargs)
         response.raise_for_status()
         return response.json()
     
@@ -157,16 +189,21 @@ class PooledOpenAIClient:
         client = await self._get_client()
         kwargs["stream"] = True
         
-        async with client.stream(
-            "POST",
-            "/chat/completions", 
-            json=kwargs,
-            headers={"Content-Type": "application/json"}
-        ) as response:
+        async with client.stream("POST", "/chat/completions", json=kwargs) as response:
             response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    yield line[6:]  # Remove "data: " prefix
+            # Split SSE lines at the byte level and only decode event payloads
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                start = 0
+                while (newline := buffer.find(b"\n", start)) != -1:
+                    if buffer.startswith(b"data: ", start):
+                        yield buffer[start + 6:newline].rstrip(b"\r").decode("utf-8")
+                    start = newline + 1
+                del buffer[:start]
+            # The final event may arrive without a trailing newline
+            if buffer.startswith(b"data: "):
+                yield buffer[6:].rstrip(b"\r").decode("utf-8")
 
 
 # Performance monitoring for connection pools
@@ -177,13 +214,11 @@ class ConnectionPoolMetrics:
         self.request_count = 0
         self.connection_reuse_count = 0
         self.total_request_time = 0.0
-        self.average_request_time = 0.0
     
     def record_request(self, duration: float, connection_reused: bool = False):
         """Record a request for metrics."""
         self.request_count += 1
         self.total_request_time += duration
-        self.average_request_time = self.total_request_time / self.request_count
         
         if connection_reused:
             self.connection_reuse_count += 1
@@ -191,12 +226,14 @@ class ConnectionPoolMetrics:
     def get_stats(self) -> dict:
         """Get connection pool statistics."""
         reuse_rate = (self.connection_reuse_count / self.request_count * 100) if self.request_count > 0 else 0
+        # Averaged here rather than per request since stats are read far less often
+        average_request_time = self.total_request_time / self.request_count if self.request_count > 0 else 0
         
         return {
             "total_requests": self.request_count,
             "connection_reuse_count": self.connection_reuse_count,
             "connection_reuse_rate_percent": round(reuse_rate, 2),
-            "average_request_time_ms": round(self.average_request_time * 1000, 2),
+            "average_request_time_ms": round(average_request_time * 1000, 2),
             "total_request_time_seconds": round(self.total_request_time, 2)
         }
 
@@ -3,9 +3,10 @@
 
 """Dynamic import system for optional dependencies."""
 
+import functools
 import importlib
-from typing import Any, Dict, Optional, Type
-from functools import lru_cache
+import importlib.util
+from typing import Any, Dict, NamedTuple, Type
 
 from ..utils.llm_client import LLMClient as BaseLLMClient
 from .config import ModelParameters
@@ -29,6 +30,14 @@ class MissingDependencyError(ImportError):
         super().__init__(message)
 
 
+class ProviderDependency(NamedTuple):
+    """Optional dependency and client class backing a provider."""
+    package: str
+    module: str
+    class_name: str
+    install_command: str
+
+
 class DynamicLLMClientLoader:
     """
     Dynamically loads LLM client classes with optional dependencies.
@@ -41,56 +50,76 @@ class DynamicLLMClientLoader:
     """
     
     # Mapping of providers to their requirements
-    PROVIDER_DEPENDENCIES = {
-        "openai": {
-            "package": "openai",
-            "module": "trae_agent.utils.openai_client",
-            "class": "OpenAIClient",
-            "install_command": "pip install trae-agent[openai]"
-        },
-        "anthropic": {
-            "package": "anthropic",
-            "module": "trae_agent.utils.anthropic_client", 
-            "class": "AnthropicClient",
-            "install_command": "pip install trae-agent[anthropic]"
-        },
-        "google": {
-            "package": "google.genai",
-            "module": "trae_agent.utils.google_client",
-            "class": "GoogleClient", 
-            "install_command": "pip install trae-agent[google]"
-        },
-        "ollama": {
-            "package": "ollama",
-            "module": "trae_agent.utils.ollama_client",
-            "class": "OllamaClient",
-            "install_command": "pip install trae-agent[ollama]"
-        },
-        "azure": {
-            "package": "openai",  # Azure uses OpenAI client
-            "module": "trae_agent.utils.azure_client",
-            "class": "AzureClient",
-            "install_command": "pip install trae-agent[openai]"
-        },
-        "openrouter": {
-            "package": "openai",  # OpenRouter uses OpenAI client
-            "module": "trae_agent.utils.openrouter_client",
-            "class": "OpenRouterClient",
-            "install_command": "pip install trae-agent[openai]"
-        },
-        "doubao": {
-            "package": "openai",  # Doubao uses OpenAI client
-            "module": "trae_agent.utils.doubao_client",
-            "class": "DoubaoClient",
-            "install_command": "pip install trae-agent[openai]"
-        }
+    PROVIDER_DEPENDENCIES: Dict[str, ProviderDependency] = {
+        "openai": ProviderDependency(
+            package="openai",
+            module="trae_agent.utils.openai_client",
+            class_name="OpenAIClient",
+            install_command="pip install trae-agent[openai]"
+        ),
+        "anthropic": ProviderDependency(
+            package="anthropic",
+            module="trae_agent.utils.anthropic_client",
+            class_name="AnthropicClient",
+            install_command="pip install trae-agent[anthropic]"
+        ),
+        "google": ProviderDependency(
+            package="google.genai",
+            module="trae_agent.utils.google_client",
+            class_name="GoogleClient",
+            install_command="pip install trae-agent[google]"
+        ),
+        "ollama": ProviderDependency(
+            package="ollama",
+            module="trae_agent.utils.ollama_client",
+            class_name="OllamaClient",
+            install_command="pip install trae-agent[ollama]"
+        ),
+        "azure": ProviderDependency(
+            package="openai",  # Azure uses OpenAI client
+            module="trae_agent.utils.azure_client",
+            class_name="AzureClient",
+            install_command="pip install trae-agent[openai]"
+        ),
+        "openrouter": ProviderDependency(
+            package="openai",  # OpenRouter uses OpenAI client
+            module="trae_agent.utils.openrouter_client",
+            class_name="OpenRouterClient",
+            install_command="pip install trae-agent[openai]"
+        ),
+        "doubao": ProviderDependency(
+            package="openai",  # Doubao uses OpenAI client
+            module="trae_agent.utils.doubao_client",
+            class_name="DoubaoClient",
+            install_command="pip install trae-agent[openai]"
+        )
     }
     
     def __init__(self):
         self._loaded_clients: Dict[str, Type[BaseLLMClient]] = {}
         self._availability_cache: Dict[str, bool] = {}
+        self._prewarm_availability_cache()
+    
+    @staticmethod
+    def _is_package_installed(package: str) -> bool:
+        """Check if a package can be imported without executing it."""
+        try:
+            return importlib.util.find_spec(package) is not None
+        except (ImportError, ValueError):
+            # Raised when a parent package of a dotted name is missing
+            return False
+    
+    def _prewarm_availability_cache(self) -> None:
+        """Probe every provider package up front, once per distinct package."""
+        # find_spec is cheap enough that a thread pool costs more than it saves
+        installed = {
+            package: self._is_package_installed(package)
+            for package in {info.package for info in self.PROVIDER_DEPENDENCIES.values()}
+        }
+        
+        for provider, info in self.PROVIDER_DEPENDENCIES.items():
+            self._availability_cache[provider] = installed[info.package]
     
-    @lru_cache(maxsize=32)
     def is_provider_available(self, provider: str) -> bool:
         """Check if a provider's dependencies are available."""
         if provider not in self.PROVIDER_DEPENDENCIES:
@@ -99,29 +128,28 @@ class DynamicLLMClientLoader:
         if provider in self._availability_cache:
             return self._availability_cache[provider]
         
-        dep_info = self.PROVIDER_DEPENDENCIES[provider]
-        try:
-            importlib.import_module(dep_info["package"])
-            self._availability_cache[provider] = True
-            return True
-        except ImportError:
-            self._availability_cache[provider] = False
-            return False
+        available = self._is_package_installed(self.PROVIDER_DEPENDENCIES[provider].package)
+        self._availability_cache[provider] = available
+        return available
+    
+    def _partition_providers(self) -> tuple[list[str], Dict[str, str]]:
+        """Split providers into available ones and missing ones with their install commands."""
+        available = []
+        missing = {}
+        for provider, info in self.PROVIDER_DEPENDENCIES.items():
+            if self.is_provider_available(provider):
+                available.append(provider)
+            else:
+                missing[provider] = info.install_command
+        return available, missing
     
     def get_available_providers(self) -> list[str]:
         """Get list of providers with available dependencies."""
-        return [
-            provider for provider in self.PROVIDER_DEPENDENCIES.keys()
-            if self.is_provider_available(provider)
-        ]
+        return self._partition_providers()[0]
     
     def get_missing_providers(self) -> Dict[str, str]:
         """Get list of providers with missing dependencies and their install commands."""
-        missing = {}
-        for provider, info in self.PROVIDER_DEPENDENCIES.items():
-            if not self.is_provider_available(provider):
-                missing[provider] = info["install_command"]
-        return missing
+        return self._partition_providers()[1]
     
     def load_client_class(self, provider: str) -> Type[BaseLLMClient]:
         """Load and return the client class for the specified provider."""
@@ -137,16 +165,16 @@ class DynamicLLMClientLoader:
         if not self.is_provider_available(provider):
             raise MissingDependencyError(
                 provider=provider,
-                package=dep_info["package"], 
-                install_command=dep_info["install_command"]
+                package=dep_info.package, 
+                install_command=dep_info.install_command
             )
         
         try:
             # Import the module
-            module = importlib.import_module(dep_info["module"])
+            module = importlib.import_module(dep_info.module)
             
             # Get the client class
-            client_class = getattr(module, dep_info["class"])
+            client_class = getattr(module, dep_info.class_name)
             
             # Cache the loaded class
             self._loaded_clients[provider] = client_class
@@ -156,11 +184,11 @@ class DynamicLLMClientLoader:
         except ImportError as e:
             raise MissingDependencyError(
                 provider=provider,
-                package=dep_info["package"],
-                install_command=dep_info["install_command"]
+                package=dep_info.package,
+                install_command=dep_info.install_command
             ) from e
         except AttributeError as e:
-            raise ImportError(f"Client class {dep_info['class']} not found in {dep_info['module']}") from e
+            raise ImportError(f"Client class {dep_info.class_name} not found in {dep_info.module}") from e
     
     def create_client(self, provider: str, model_parameters: ModelParameters) -> BaseLLMClient:
         """Create a client instance for the specified provider."""
@@ -169,8 +197,7 @@ class DynamicLLMClientLoader:
     
     def get_dependency_info(self) -> Dict[str, Any]:
         """Get comprehensive dependency information."""
-        available = self.get_available_providers()
-        missing = self.get_missing_providers()
+        available, missing = self._partition_providers()
         
         return {
             "available_providers": available,
@@ -183,9 +210,9 @@ class DynamicLLMClientLoader:
             },
             "dependency_details": {
                 provider: {
-                    "available": self.is_provider_available(provider),
-                    "package": info["package"],
-                    "install_command": info["install_command"]
+                    "available": provider not in missing,
+                    "package": info.package,
+                    "install_command": info.install_command
                 }
                 for provider, info in self.PROVIDER_DEPENDENCIES.items()
             }
@@ -205,7 +232,7 @@ class DynamicLLMClientLoader:
             return {
                 "valid": False,
                 "error": f"Missing dependency for {provider}",
-                "suggestion": f"Install with: {dep_info['install_command']}"
+                "suggestion": f"Install with: {dep_info.install_command}"
             }
         
         try:
@@ -219,39 +246,38 @@ class DynamicLLMClientLoader:
             return {
                 "valid": False,
                 "error": f"Failed to load {provider} client: {str(e)}",
-                "suggestion": f"Try reinstalling: {self.PROVIDER_DEPENDENCIES[provider]['install_command']}"
+                "suggestion": f"Try reinstalling: {self.PROVIDER_DEPENDENCIES[provider].install_command}"
             }
 
 
-# Global loader instance
-_global_loader = DynamicLLMClientLoader()
-
-
+# The global loader is built on first use so importing this module stays cheap
+@functools.cache
 def get_client_loader() -> DynamicLLMClientLoader:
     """Get the global dynamic client loader."""
-    return _global_loader
+    return DynamicLLMClientLoader()
 
 
 def load_llm_client(provider: str, model_parameters: ModelParameters) -> BaseLLMClient:
     """Load an LLM client with dynamic dependency handling."""
-    return _global_loader.create_client(provider, model_parameters)
+    return get_client_loader().create_client(provider, model_parameters)
 
 
 def check_provider_availability(provider: str) -> bool:
     """Check if a provider is available."""
-    return _global_loader.is_provider_available(provider)
+    return get_client_loader().is_provider_available(provider)
 
 
 def get_dependency_report() -> Dict[str, Any]:
     """Get a comprehensive dependency report."""
-    return _global_loader.get_dependency_info()
+    return get_client_loader().get_dependency_info()
 
 
 def validate_all_providers() -> Dict[str, Any]:
     """Validate all provider setups."""
+    loader = get_client_loader()
     results = {}
-    for provider in _global_loader.PROVIDER_DEPENDENCIES.keys():
-        results[provider] = _global_loader.validate_provider_setup(provider)
+    for provider in loader.PROVIDER_DEPENDENCIES:
+        results[provider] = loader.validate_provider_setup(provider)
     return results
 
 
@@ -280,7 +306,7 @@ def install_suggestions(providers: list[str]) -> list[str]:
     """Get installation suggestions for specific providers."""
     suggestions = []
     for provider in providers:
-        if provider in _global_loader.PROVIDER_DEPENDENCIES:
-            cmd = _global_loader.PROVIDER_DEPENDENCIES[provider]["install_command"]
+        if provider in DynamicLLMClientLoader.PROVIDER_DEPENDENCIES:
+            cmd = DynamicLLMClientLoader.PROVIDER_DEPENDENCIES[provider].install_command
             suggestions.append(f"For {provider}: {cmd}")
     return suggestions
\ No newline at end of file
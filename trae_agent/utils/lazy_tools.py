@@ -3,13 +3,28 @@
 
 """Lazy tool loading system for improved startup performance."""
 
+import threading
 import time
-from typing import Dict, Type, Optional, Any
-from functools import cached_property
+import weakref
+from typing import Dict, Iterable, Type, Optional, Any
+from functools import lru_cache
+from operator import attrgetter
 
 from ..tools.base import Tool
 
 
+class _ToolEntry:
+    """An instantiated tool together with its loading and usage statistics."""
+    
+    __slots__ = ("name", "tool", "load_time", "access_count")
+    
+    def __init__(self, name: str, tool: Tool, load_time: float):
+        self.name = name
+        self.tool = tool
+        self.load_time = load_time
+        self.access_count = 0
+
+
 class LazyToolLoader:
     """
     Lazy tool loader that instantiates tools only when needed.
@@ -24,30 +39,48 @@ class LazyToolLoader:
     def __init__(self, tool_registry: Dict[str, Type[Tool]], model_provider: str):
         self._tool_registry = tool_registry
         self._model_provider = model_provider
-        self._instantiated_tools: Dict[str, Tool] = {}
-        self._load_times: Dict[str, float] = {}
-        self._access_count: Dict[str, int] = {}
+        # The tool and its statistics are always accessed together, so they share one record
+        self._entries: Dict[str, _ToolEntry] = {}
+        # One lock per tool, so concurrent preloads build different tools in parallel
+        self._construct_locks: Dict[str, threading.Lock] = {}
+        # Warm lookups go through the C-implemented lru_cache instead of a Python-level check
+        self._make_tool = lru_cache(maxsize=None)(self._construct)
+    
+    def _construct(self, tool_name: str) -> _ToolEntry:
+        """Return the entry for a tool, instantiating the tool if needed."""
+        entry = self._entries.get(tool_name)
+        if entry is not None:
+            return entry
+        
+        if tool_name not in self._tool_registry:
+            raise ValueError(f"Tool '{tool_name}' not found in registry. Available tools: {list(self._tool_registry.keys())}")
+        
+        with self._construct_locks.setdefault(tool_name, threading.Lock()):
+            # Another thread may have built the tool while we waited for the lock
+            entry = self._entries.get(tool_name)
+            if entry is None:
+                start_time = time.perf_counter()
+                
+                # Instantiate the tool
+                tool_class = self._tool_registry[tool_name]
+                tool = tool_class(model_provider=self._model_provider)
+                
+                # Record loading time
+                entry = _ToolEntry(tool_name, tool, time.perf_counter() - start_time)
+                self._entries[tool_name] = entry
+        return entry
     
     def get_tool(self, tool_name: str) -> Tool:
         """Get a tool instance, loading it lazily if not already instantiated."""
-        if tool_name not in self._instantiated_tools:
-            start_time = time.perf_counter()
-            
-            if tool_name not in self._tool_registry:
-                raise ValueError(f"Tool '{tool_name}' not found in registry. Available tools: {list(self._tool_registry.keys())}")
-            
-            # Instantiate the tool
-            tool_class = self._tool_registry[tool_name]
-            self._instantiated_tools[tool_name] = tool_class(model_provider=self._model_provider)
-            
-            # Record loading time
-            load_time = time.perf_counter() - start_time
-            self._load_times[tool_name] = load_time
-            self._access_count[tool_name] = 0
+        entry = self._make_tool(tool_name)
         
         # Track access
-        self._access_count[tool_name] += 1
-        return self._instantiated_tools[tool_name]
+        entry.access_count += 1
+        return entry.tool
+    
+    def has_tool(self, tool_name: str) -> bool:
+        """Check whether a tool is registered without building the list of names."""
+        return tool_name in self._tool_registry
     
     def get_available_tools(self) -> list[str]:
         """Get list of available tool names."""
@@ -55,50 +88,67 @@ class LazyToolLoader:
     
     def get_instantiated_tools(self) -> list[Tool]:
         """Get list of currently instantiated tools."""
-        return list(self._instantiated_tools.values())
+        return [entry.tool for entry in self._entries.values()]
     
-    def preload_tools(self, tool_names: list[str]) -> None:
-        """Preload specific tools (useful for warming up frequently used tools)."""
-        for tool_name in tool_names:
-            self.get_tool(tool_name)
+    def preload_tools(self, tool_names: Iterable[str], parallel: bool = False) -> None:
+        """Preload specific tools (useful for warming up frequently used tools).
+        
+        Set ``parallel`` only for tools whose constructors block on I/O; the built-in
+        tools construct in microseconds, far less than a thread pool costs to start.
+        """
+        tool_names = list(tool_names)
+        if not parallel or len(tool_names) < 2:
+            for tool_name in tool_names:
+                self.get_tool(tool_name)
+            return
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(tool_names))) as executor:
+            list(executor.map(self.get_tool, tool_names))
     
-    def get_loading_stats(self) -> Dict[str, Any]:
-        """Get statistics about tool loading performance."""
-        total_load_time = sum(self._load_times.values())
-        most_used = max(self._access_count.items(), key=lambda x: x[1]) if self._access_count else ("none", 0)
+    def get_loading_stats(self, detailed: bool = False) -> Dict[str, Any]:
+        """Get statistics about tool loading performance.
         
-        return {
-            "instantiated_tools": len(self._instantiated_tools),
+        Per-tool statistics are only included when ``detailed`` is set.
+        """
+        total_load_time = sum(map(attrgetter("load_time"), self._entries.values()))
+        # Entries carry their name, so the most used one is found without building pairs
+        most_used = max(self._entries.values(), key=attrgetter("access_count"), default=None)
+        
+        stats = {
+            "instantiated_tools": len(self._entries),
             "available_tools": len(self._tool_registry),
             "total_load_time_ms": round(total_load_time * 1000, 2),
-            "average_load_time_ms": round((total_load_time / len(self._load_times)) * 1000, 2) if self._load_times else 0,
-            "most_used_tool": most_used[0],
-            "most_used_tool_accesses": most_used[1],
-            "load_efficiency_percent": round((len(self._instantiated_tools) / len(self._tool_registry)) * 100, 2),
-            "detailed_stats": {
+            "average_load_time_ms": round((total_load_time / len(self._entries)) * 1000, 2) if self._entries else 0,
+            "most_used_tool": most_used.name if most_used else "none",
+            "most_used_tool_accesses": most_used.access_count if most_used else 0,
+            "load_efficiency_percent": round((len(self._entries) / len(self._tool_registry)) * 100, 2),
+        }
+        if detailed:
+            stats["detailed_stats"] = {
                 tool_name: {
-                    "load_time_ms": round(load_time * 1000, 2),
-                    "access_count": self._access_count.get(tool_name, 0)
+                    "load_time_ms": round(entry.load_time * 1000, 2),
+                    "access_count": entry.access_count
                 }
-                for tool_name, load_time in self._load_times.items()
+                for tool_name, entry in self._entries.items()
             }
-        }
+        return stats
     
     def cleanup_unused_tools(self, min_access_count: int = 1) -> int:
         """Remove tools that haven't been accessed frequently."""
-        tools_to_remove = [
-            tool_name for tool_name, access_count in self._access_count.items()
-            if access_count < min_access_count
-        ]
+        kept_entries = {
+            tool_name: entry for tool_name, entry in self._entries.items()
+            if entry.access_count >= min_access_count
+        }
+        removed = len(self._entries) - len(kept_entries)
+        self._entries = kept_entries
         
-        for tool_name in tools_to_remove:
-            if tool_name in self._instantiated_tools:
-                del self._instantiated_tools[tool_name]
-                del self._access_count[tool_name]
-                if tool_name in self._load_times:
-                    del self._load_times[tool_name]
+        # lru_cache cannot drop single keys; surviving tools are found again in _entries
+        if removed:
+            self._make_tool.cache_clear()
         
-        return len(tools_to_remove)
+        return removed
 
 
 class LazyToolProxy:
@@ -109,7 +159,11 @@ class LazyToolProxy:
     deferring actual instantiation until method calls.
     """
     
+    __slots__ = ("_tool_name", "_loader", "_tool", "name", "__weakref__")
+    
     def __init__(self, tool_name: str, loader: LazyToolLoader):
+        # The tool name is available without loading the tool
+        self.name = tool_name
         self._tool_name = tool_name
         self._loader = loader
         self._tool: Optional[Tool] = None
@@ -118,13 +172,10 @@ class LazyToolProxy:
         """Ensure the tool is loaded and return it."""
         if self._tool is None:
             self._tool = self._loader.get_tool(self._tool_name)
+            # From now on delegate straight to the tool without the load check
+            self.__class__ = _LoadedToolProxy
         return self._tool
     
-    @cached_property
-    def name(self) -> str:
-        """Get tool name without loading the tool."""
-        return self._tool_name
-    
     def __getattr__(self, attr_name: str) -> Any:
         """Delegate all other attribute access to the actual tool."""
         tool = self._ensure_loaded()
@@ -138,6 +189,27 @@ class LazyToolProxy:
         return f"LazyToolProxy({self._tool_name}, {loaded_status})"
 
 
+class _LoadedToolProxy(LazyToolProxy):
+    """A LazyToolProxy whose tool has been loaded."""
+    
+    # Same layout as LazyToolProxy, which the __class__ switch requires
+    __slots__ = ()
+    
+    def _ensure_loaded(self) -> Tool:
+        return self._tool
+    
+    def __getattr__(self, attr_name: str) -> Any:
+        return getattr(self._tool, attr_name)
+
+
+# Common tool combinations for performance
+_FREQUENTLY_USED_TOOLS = (
+    "str_replace_based_edit_tool",
+    "bash",
+    "task_done"
+)
+
+
 class OptimizedToolManager:
     """
     Tool manager with lazy loading and performance optimizations.
@@ -151,16 +223,25 @@ class OptimizedToolManager:
     
     def __init__(self, tool_registry: Dict[str, Type[Tool]], model_provider: str):
         self._loader = LazyToolLoader(tool_registry, model_provider)
-        self._tool_proxies: Dict[str, LazyToolProxy] = {}
+        # Proxies the caller no longer holds are dropped automatically
+        self._tool_proxies: weakref.WeakValueDictionary[str, LazyToolProxy] = weakref.WeakValueDictionary()
+        # Counted separately, since collected proxies disappear from _tool_proxies
+        self._proxies_created = 0
+        # The registry is fixed for the manager's lifetime, so resolve the preload set once
+        self._preload_set = tuple(tool for tool in _FREQUENTLY_USED_TOOLS if tool in tool_registry)
         self._initialization_time = time.perf_counter()
     
     def get_tools_list(self, tool_names: list[str]) -> list[LazyToolProxy]:
         """Get list of tool proxies for the specified tool names."""
         tools = []
         for tool_name in tool_names:
-            if tool_name not in self._tool_proxies:
-                self._tool_proxies[tool_name] = LazyToolProxy(tool_name, self._loader)
-            tools.append(self._tool_proxies[tool_name])
+            # A single lookup, since an unreferenced proxy may be collected at any time
+            proxy = self._tool_proxies.get(tool_name)
+            if proxy is None:
+                proxy = LazyToolProxy(tool_name, self._loader)
+                self._tool_proxies[tool_name] = proxy
+                self._proxies_created += 1
+            tools.append(proxy)
         return tools
     
     def get_tool_by_name(self, tool_name: str) -> Tool:
@@ -169,48 +250,36 @@ class OptimizedToolManager:
     
     def preload_frequently_used_tools(self) -> None:
         """Preload tools that are commonly used together."""
-        # Common tool combinations for performance
-        common_tools = [
-            "str_replace_based_edit_tool",
-            "bash",
-            "task_done"
-        ]
-        
-        available_common = [tool for tool in common_tools if tool in self._loader.get_available_tools()]
-        if available_common:
-            self._loader.preload_tools(available_common)
+        if self._preload_set:
+            self._loader.preload_tools(self._preload_set)
     
-    def get_performance_report(self) -> Dict[str, Any]:
-        """Get comprehensive performance report."""
+    def get_performance_report(self, detailed: bool = False) -> Dict[str, Any]:
+        """Get comprehensive performance report, with per-tool statistics if ``detailed``."""
         runtime = time.perf_counter() - self._initialization_time
-        loader_stats = self._loader.get_loading_stats()
+        loader_stats = self._loader.get_loading_stats(detailed=detailed)
         
         return {
             "manager_runtime_seconds": round(runtime, 2),
             "memory_efficiency": {
-                "total_proxies_created": len(self._tool_proxies),
+                "total_proxies_created": self._proxies_created,
+                "live_proxies": len(self._tool_proxies),
                 "tools_actually_loaded": loader_stats["instantiated_tools"],
                 "memory_savings_percent": round(
-                    (1 - (loader_stats["instantiated_tools"] / len(self._tool_proxies))) * 100, 2
-                ) if self._tool_proxies else 0
+                    (1 - (loader_stats["instantiated_tools"] / self._proxies_created)) * 100, 2
+                ) if self._proxies_created else 0
             },
             "loading_performance": loader_stats
         }
     
+    def get_detailed_performance_report(self) -> Dict[str, Any]:
+        """Get the performance report including per-tool statistics."""
+        return self.get_performance_report(detailed=True)
+    
     def optimize_memory(self) -> Dict[str, int]:
         """Perform memory optimization by cleaning up unused tools."""
         unused_removed = self._loader.cleanup_unused_tools(min_access_count=2)
         
-        # Also cleanup unused proxies
-        used_proxies = set()
-        for tool_name in self._loader._instantiated_tools.keys():
-            used_proxies.add(tool_name)
-        
-        unused_proxies = [name for name in self._tool_proxies.keys() if name not in used_proxies]
-        for proxy_name in unused_proxies:
-            del self._tool_proxies[proxy_name]
-        
+        # Unused proxies need no cleanup; they are weakly referenced
         return {
-            "unused_tools_removed": unused_removed,
-            "unused_proxies_removed": len(unused_proxies)
+            "unused_tools_removed": unused_removed
         }
\ No newline at end of file
@@ -3,16 +3,68 @@
 
 """Optimized trajectory recording functionality for Trae Agent with performance improvements."""
 
-import json
-import asyncio
+import os
+import threading
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any
-from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO
 
 from ..tools.base import ToolCall, ToolResult
 from .llm_basics import LLMMessage, LLMResponse
 
+try:
+    import orjson
+except ImportError:  # optional speedup, installed with trae-agent[performance]
+    orjson = None
+
+
+def _dump_json(data: Any) -> bytes:
+    """Encode data as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    import json  # only needed without orjson; kept off the import path of the module
+
+    return json.dumps(data, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _dump_json_line(data: Any) -> bytes:
+    """Encode data as one newline-terminated line of UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(
+            data, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+    import json
+
+    return json.dumps(data, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+
+def _load_json(data: bytes) -> Any:
+    """Decode UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    import json
+
+    return json.loads(data)
+
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    """Write data to a temporary file next to path, then rename it over path."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            # A single write normally suffices; loop only on a short write
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
 
 class OptimizedTrajectoryRecorder:
     """
@@ -20,8 +72,8 @@ class OptimizedTrajectoryRecorder:
     
     Performance improvements:
     - Batched writing: Only saves to disk every N interactions
-    - Background I/O: Uses thread pool for file operations
-    - Memory efficient: Optionally limits trajectory size
+    - Background I/O: A single writer thread coalesces pending saves
+    - Memory efficient: Optionally limits trajectory size, spilling older records to disk
     """
 
     def __init__(
@@ -36,7 +88,9 @@ class OptimizedTrajectoryRecorder:
         Args:
             trajectory_path: Path to save trajectory file. If None, generates default path.
             batch_size: Number of interactions to accumulate before writing to disk
-            max_interactions: Maximum number of interactions to keep in memory (None = unlimited)
+            max_interactions: Maximum number of interactions and of agent steps to keep in
+                memory (None = unlimited). Older records are appended to a
+                ``.evicted.jsonl`` file next to the trajectory.
             background_io: Whether to use background thread for I/O operations
         """
         if trajectory_path is None:
@@ -44,16 +98,27 @@ class OptimizedTrajectoryRecorder:
             trajectory_path = f"trajectory_{timestamp}.json"
 
         self.trajectory_path: Path = Path(trajectory_path)
+        self.evicted_records_path: Path = self.trajectory_path.with_suffix(".evicted.jsonl")
         self.batch_size = batch_size
         self.max_interactions = max_interactions
         self.background_io = background_io
         
         # Batching state
         self._batch_count = 0
-        self._pending_writes = []
+        # Bumped on every change, so saves can skip writing a trajectory already on disk
+        self._version = 0
+        self._persisted_version = -1
+        self._evicted_file: BinaryIO | None = None
         
-        # Background I/O
-        self._executor = ThreadPoolExecutor(max_workers=1) if background_io else None
+        # Background I/O: batch rollovers only mark the trajectory dirty and wake the
+        # writer, so several triggers during one save collapse into a single write.
+        # The writer starts on the first rollover, so a recorder that never saves in
+        # the background never owns a thread.
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._stop_requested = False
+        self._wake = threading.Event()
+        self._writer: threading.Thread | None = None
         
         self.trajectory_data: dict[str, Any] = {
             "task": "",
@@ -62,12 +127,14 @@ class OptimizedTrajectoryRecorder:
             "provider": "",
             "model": "",
             "max_steps": 0,
-            "llm_interactions": [],
-            "agent_steps": [],
             "success": False,
             "final_result": None,
             "execution_time": 0.0,
         }
+        # Records are only kept encoded, once, when recorded: saves stitch the fragments
+        # together and get_llm_interactions()/get_agent_steps() decode them on demand
+        self._interaction_blobs = self._new_history()
+        self._step_blobs = self._new_history()
         self._start_time: datetime | None = None
 
     def start_recording(self, task: str, provider: str, model: str, max_steps: int) -> None:
@@ -80,10 +147,14 @@ class OptimizedTrajectoryRecorder:
                 "provider": provider,
                 "model": model,
                 "max_steps": max_steps,
-                "llm_interactions": [],
-                "agent_steps": [],
             }
         )
+        self._interaction_blobs = self._new_history()
+        self._step_blobs = self._new_history()
+        # Records spilled by an earlier recording to the same path are stale
+        self._close_evicted_file()
+        self.evicted_records_path.unlink(missing_ok=True)
+        self._version += 1
         # Initial save
         self._maybe_save_trajectory()
 
@@ -96,6 +167,8 @@ class OptimizedTrajectoryRecorder:
         tools: list[Any] | None = None,
     ) -> None:
         """Record an LLM interaction with batching."""
+        # LLMUsage is a plain dataclass, so its fields can be read from one dict
+        usage = vars(response.usage) if response.usage else {}
         interaction = {
             "timestamp": datetime.now().isoformat(),
             "provider": provider,
@@ -106,21 +179,11 @@ class OptimizedTrajectoryRecorder:
                 "model": response.model,
                 "finish_reason": response.finish_reason,
                 "usage": {
-                    "input_tokens": response.usage.input_tokens if response.usage else None,
-                    "output_tokens": response.usage.output_tokens if response.usage else None,
-                    "cache_creation_input_tokens": getattr(
-                        response.usage, "cache_creation_input_tokens", None
-                    )
-                    if response.usage
-                    else None,
-                    "cache_read_input_tokens": getattr(
-                        response.usage, "cache_read_input_tokens", None
-                    )
-                    if response.usage
-                    else None,
-                    "reasoning_tokens": getattr(response.usage, "reasoning_tokens", None)
-                    if response.usage
-                    else None,
+                    "input_tokens": usage.get("input_tokens"),
+                    "output_tokens": usage.get("output_tokens"),
+                    "cache_creation_input_tokens": usage.get("cache_creation_input_tokens"),
+                    "cache_read_input_tokens": usage.get("cache_read_input_tokens"),
+                    "reasoning_tokens": usage.get("reasoning_tokens"),
                 },
                 "tool_calls": [self._serialize_tool_call(tc) for tc in response.tool_calls]
                 if response.tool_calls
@@ -129,13 +192,8 @@ class OptimizedTrajectoryRecorder:
             "tools_available": [tool.name for tool in tools] if tools else None,
         }
 
-        self.trajectory_data["llm_interactions"].append(interaction)
-        
-        # Memory management
-        if self.max_interactions and len(self.trajectory_data["llm_interactions"]) > self.max_interactions:
-            # Remove oldest interaction
-            self.trajectory_data["llm_interactions"].pop(0)
-        
+        self._append_record("llm_interactions", interaction, self._interaction_blobs)
+        self._version += 1
         self._batch_count += 1
         self._maybe_save_trajectory()
 
@@ -151,6 +209,7 @@ class OptimizedTrajectoryRecorder:
         error: str | None = None,
     ) -> None:
         """Record an agent execution step with batching."""
+        usage = vars(llm_response.usage) if llm_response and llm_response.usage else None
         step_data = {
             "step_number": step_number,
             "timestamp": datetime.now().isoformat(),
@@ -163,12 +222,10 @@ class OptimizedTrajectoryRecorder:
                 "model": llm_response.model,
                 "finish_reason": llm_response.finish_reason,
                 "usage": {
-                    "input_tokens": llm_response.usage.input_tokens if llm_response.usage else None,
-                    "output_tokens": llm_response.usage.output_tokens
-                    if llm_response.usage
-                    else None,
+                    "input_tokens": usage.get("input_tokens"),
+                    "output_tokens": usage.get("output_tokens"),
                 }
-                if llm_response.usage
+                if usage is not None
                 else None,
                 "tool_calls": [self._serialize_tool_call(tc) for tc in llm_response.tool_calls]
                 if llm_response.tool_calls
@@ -186,20 +243,90 @@ class OptimizedTrajectoryRecorder:
             "error": error,
         }
 
-        self.trajectory_data["agent_steps"].append(step_data)
+        self._append_record("agent_steps", step_data, self._step_blobs)
+        self._version += 1
         self._batch_count += 1
         self._maybe_save_trajectory()
 
+    def _new_history(self) -> deque[Any] | list[Any]:
+        """Create a record list, bounded to max_interactions if set."""
+        if self.max_interactions:
+            return deque(maxlen=self.max_interactions)
+        return []
+
+    def _append_record(
+        self, key: str, record: dict[str, Any], blobs: deque[bytes] | list[bytes]
+    ) -> None:
+        """Encode a record into its history, spilling the record a full history will drop."""
+        try:
+            blob = _dump_json(record)
+        except Exception as e:
+            print(f"Warning: Failed to record {key} entry for {self.trajectory_path}: {e}")
+            return
+
+        if self.max_interactions and len(blobs) == self.max_interactions:
+            self._spill_record(key, blobs[0])
+        # A bounded history drops its oldest record on append
+        blobs.append(blob)
+
+    def _spill_record(self, key: str, blob: bytes) -> None:
+        """Append a record evicted from memory to the JSONL sidecar file."""
+        try:
+            record = _load_json(blob)
+            if self._evicted_file is None:
+                self.evicted_records_path.parent.mkdir(parents=True, exist_ok=True)
+                # Unbuffered, so each record lands on disk with a single write. The handle
+                # outlives this call and is closed by _close_evicted_file.
+                self._evicted_file = open(  # noqa: SIM115
+                    self.evicted_records_path, "ab", buffering=0
+                )
+            self._evicted_file.write(_dump_json_line({"type": key, "record": record}))
+        except Exception as e:
+            print(f"Warning: Failed to spill record to {self.evicted_records_path}: {e}")
+
+    def _close_evicted_file(self) -> None:
+        """Close the JSONL sidecar file if it is open."""
+        if self._evicted_file is not None:
+            self._evicted_file.close()
+            self._evicted_file = None
+
     def _maybe_save_trajectory(self) -> None:
         """Save trajectory only if batch size is reached."""
         if self._batch_count >= self.batch_size:
-            if self.background_io:
-                # Schedule background save
-                asyncio.create_task(self.save_trajectory_async())
+            # Once the writer has been stopped, later saves happen synchronously
+            if self.background_io and not self._stop_requested:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._writer_loop, name="trajectory-writer", daemon=True
+                    )
+                    self._writer.start()
+                self._dirty = True
+                self._wake.set()
             else:
                 self.save_trajectory()
             self._batch_count = 0
 
+    def _writer_loop(self) -> None:
+        """Background thread that saves whenever the trajectory is marked dirty."""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._dirty:
+                self._dirty = False
+                self.save_trajectory()
+            # Keep going if another rollover arrived during the save
+            if self._stop_requested and not self._dirty:
+                return
+
+    def _stop_writer(self) -> None:
+        """Flush any pending background save and stop the writer thread."""
+        self._stop_requested = True
+        if self._writer is None:
+            return
+        self._wake.set()
+        self._writer.join()
+        self._writer = None
+
     async def finalize_recording(self, success: bool, final_result: str | None = None) -> None:
         """Finalize the trajectory recording."""
         end_time = datetime.now()
@@ -213,34 +340,66 @@ class OptimizedTrajectoryRecorder:
                 else 0.0,
             }
         )
+        self._version += 1
+
+        # No more batches are expected; let the writer finish before the final save
+        if self._writer is not None:
+            import asyncio  # already loaded by the running event loop
+
+            await asyncio.to_thread(self._stop_writer)
 
         # Force save at the end
         if self.background_io:
             await self.save_trajectory_async()
         else:
             self.save_trajectory()
+        self._close_evicted_file()
 
     def save_trajectory(self) -> None:
         """Save the current trajectory data to file synchronously."""
         try:
-            # Ensure directory exists
-            self.trajectory_path.parent.mkdir(parents=True, exist_ok=True)
+            # The writer thread and async saves may run concurrently; snapshotting under
+            # the lock keeps an older snapshot from overwriting a newer one
+            with self._save_lock:
+                version = self._version
+                if version == self._persisted_version:
+                    return
 
-            with open(self.trajectory_path, "w", encoding="utf-8") as f:
-                json.dump(self.trajectory_data, f, indent=2, ensure_ascii=False)
+                # Ensure directory exists
+                self.trajectory_path.parent.mkdir(parents=True, exist_ok=True)
+                # Readers never see a partially written trajectory
+                _write_file_atomic(self.trajectory_path, self._encode_trajectory())
+                self._persisted_version = version
 
         except Exception as e:
             print(f"Warning: Failed to save trajectory to {self.trajectory_path}: {e}")
 
+    def _encode_trajectory(self) -> bytes:
+        """Encode the trajectory, reusing the fragments cached for each record."""
+        # Drop the envelope's closing brace and append the record arrays before it
+        head = _dump_json(self.trajectory_data).rstrip()[:-1].rstrip()
+        return b"".join(
+            (
+                head,
+                b',\n  "llm_interactions": [',
+                b",".join(self._interaction_blobs),
+                b'],\n  "agent_steps": [',
+                b",".join(self._step_blobs),
+                b"]\n}",
+            )
+        )
+
     async def save_trajectory_async(self) -> None:
         """Save the current trajectory data to file asynchronously."""
-        if not self._executor:
+        if not self.background_io:
             self.save_trajectory()
             return
             
         try:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(self._executor, self.save_trajectory)
+            import asyncio  # already loaded by the running event loop
+
+            # save_trajectory serializes writes itself, so the default executor is safe
+            await asyncio.to_thread(self.save_trajectory)
         except Exception as e:
             print(f"Warning: Failed to save trajectory asynchronously to {self.trajectory_path}: {e}")
 
@@ -275,11 +434,19 @@ class OptimizedTrajectoryRecorder:
             "id": getattr(tool_result, "id", None),
         }
 
+    def get_llm_interactions(self) -> list[dict[str, Any]]:
+        """Get the LLM interactions currently held in memory."""
+        return [_load_json(blob) for blob in self._interaction_blobs]
+
+    def get_agent_steps(self) -> list[dict[str, Any]]:
+        """Get the agent steps currently held in memory."""
+        return [_load_json(blob) for blob in self._step_blobs]
+
     def get_trajectory_path(self) -> str:
         """Get the path where trajectory is being saved."""
         return str(self.trajectory_path)
 
     def cleanup(self) -> None:
         """Clean up resources."""
-        if self._executor:
-            self._executor.shutdown(wait=True)
\ No newline at end of file
+        self._stop_writer()
+        self._close_evicted_file()
\ No newline at end of file